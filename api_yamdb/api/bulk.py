@@ -0,0 +1,248 @@
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import index_titles
+from reviews.versions import bump
+
+from .querysets import optimize_queryset
+from .serializers import (
+    BulkCommentSerializer, BulkReviewSerializer, BulkTitleSerializer
+)
+
+DOES_NOT_EXIST = 'Объект с {field}={value} не существует.'
+
+
+class BulkCreateMixin:
+    """Миксин пакетного создания объектов: POST <список>/bulk/.
+
+    Каждый элемент проверяется сериализатором `bulk_serializer_class`
+    без обращений к базе, затем `validate_bulk` делает проверки с базой
+    пачкой по всем элементам. Корректные элементы сохраняются в одной
+    транзакции через `perform_bulk_create`, в ответе для каждого
+    элемента возвращается результат или ошибки.
+
+    Подкласс обязан определить `perform_bulk_create(items)`: он получает
+    проверенные данные элементов и возвращает созданные объекты с
+    первичными ключами в том же порядке.
+    """
+
+    bulk_serializer_class = None
+
+    @action(detail=False, methods=('post',), url_path='bulk',
+            url_name='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Ожидается список объектов.'}, status=400
+            )
+        if len(request.data) > settings.BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {'detail': 'Слишком много объектов, максимум '
+                           f'{settings.BULK_CREATE_MAX_ITEMS}.'},
+                status=400
+            )
+        results = [None] * len(request.data)
+        items = {}
+        context = self.get_serializer_context()
+        for index, data in enumerate(request.data):
+            serializer = self.bulk_serializer_class(data=data, context=context)
+            if serializer.is_valid():
+                items[index] = dict(serializer.validated_data)
+            else:
+                results[index] = {'status': 400, 'errors': serializer.errors}
+        for index, errors in self.validate_bulk(items).items():
+            del items[index]
+            results[index] = {'status': 400, 'errors': errors}
+        if items:
+            with transaction.atomic():
+                created = self.perform_bulk_create(list(items.values()))
+            data = self.get_serializer(created, many=True).data
+            for index, item in zip(items, data):
+                results[index] = {'status': 201, 'data': item}
+        return Response(results, status=201 if items else 400)
+
+    def validate_bulk(self, items):
+        return {}
+
+
+def assign_pks(objs, queryset):
+    """Проставляет первичные ключи после bulk_create.
+
+    Если база их не вернула, берутся последние ключи из queryset: внутри
+    транзакции после вставки они принадлежат только что созданным строкам.
+    """
+    if not objs or objs[0].pk is not None:
+        return
+    pks = queryset.order_by('-pk').values_list('pk', flat=True)[:len(objs)]
+    for obj, pk in zip(objs, reversed(list(pks))):
+        obj.pk = pk
+
+
+class TitleBulkMixin(BulkCreateMixin):
+    """Пакетное создание произведений."""
+
+    bulk_serializer_class = BulkTitleSerializer
+
+    def validate_bulk(self, items):
+        taken = set(Title.objects.filter(
+            name__in=[item['name'] for item in items.values()]
+        ).values_list('name', flat=True))
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in items.values()}, field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for item in items.values() for slug in item['genre']},
+            field_name='slug'
+        )
+        errors = {}
+        for index, item in items.items():
+            item_errors = {}
+            if item['name'] in taken:
+                item_errors['name'] = [
+                    'Произведение с таким названием уже существует.'
+                ]
+            taken.add(item['name'])
+            slug = item['category']
+            item['category'] = categories.get(slug)
+            if item['category'] is None:
+                item_errors['category'] = [
+                    DOES_NOT_EXIST.format(field='slug', value=slug)
+                ]
+            missing = [slug for slug in item['genre'] if slug not in genres]
+            if missing:
+                item_errors['genre'] = [
+                    DOES_NOT_EXIST.format(field='slug', value=slug)
+                    for slug in missing
+                ]
+            item['genre'] = [genres.get(slug) for slug in item['genre']]
+            if item_errors:
+                errors[index] = item_errors
+        return errors
+
+    def perform_bulk_create(self, items):
+        titles = [
+            Title(
+                name=item['name'], year=item['year'],
+                category=item['category'], description=item['description'],
+                version=1,
+            )
+            for item in items
+        ]
+        Title.objects.bulk_create(titles)
+        pks = dict(
+            Title.objects.filter(
+                name__in=[title.name for title in titles]
+            ).values_list('name', 'pk')
+        )
+        for title in titles:
+            title.pk = pks[title.name]
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title, item in zip(titles, items)
+            for genre in set(item['genre'])
+        )
+        index_titles(titles)
+        bump('title')
+        return list(optimize_queryset(
+            Title.objects.filter(pk__in=pks.values()).order_by('pk'),
+            self.get_serializer_class(),
+        ))
+
+
+class AuthoredBulkMixin(BulkCreateMixin):
+    """Пакетное создание объектов с автором.
+
+    Автор по умолчанию — текущий пользователь; указать другого автора
+    по имени может только администратор.
+    """
+
+    def validate_authors(self, items):
+        user = self.request.user
+        usernames = {
+            item['author'] for item in items.values() if 'author' in item
+        }
+        authors = User.objects.in_bulk(usernames, field_name='username')
+        errors = {}
+        for index, item in items.items():
+            username = item.get('author')
+            if username is None:
+                item['author'] = user
+            elif not user.is_admin:
+                errors[index] = {'author': [
+                    'Указывать автора может только администратор.'
+                ]}
+            elif username not in authors:
+                errors[index] = {'author': [
+                    DOES_NOT_EXIST.format(field='username', value=username)
+                ]}
+            else:
+                item['author'] = authors[username]
+        return errors
+
+
+class ReviewBulkMixin(AuthoredBulkMixin):
+    """Пакетное создание отзывов к произведению."""
+
+    bulk_serializer_class = BulkReviewSerializer
+
+    def validate_bulk(self, items):
+        self.bulk_title = get_object_or_404(
+            Title, pk=self.kwargs.get('title_id')
+        )
+        errors = self.validate_authors(items)
+        valid = [
+            item['author'].pk
+            for index, item in items.items() if index not in errors
+        ]
+        taken = set(Review.objects.filter(
+            title=self.bulk_title, author__in=valid
+        ).values_list('author', flat=True))
+        for index, item in items.items():
+            if index in errors:
+                continue
+            if item['author'].pk in taken:
+                errors[index] = {'non_field_errors': [
+                    'На каждое произведение можно опубликовать только '
+                    'один отзыв.'
+                ]}
+            taken.add(item['author'].pk)
+        return errors
+
+    def perform_bulk_create(self, items):
+        title = self.bulk_title
+        reviews = Review.objects.bulk_create(
+            Review(title=title, **item) for item in items
+        )
+        pks = dict(Review.objects.filter(
+            title=title, author__in=[review.author for review in reviews]
+        ).values_list('author', 'pk'))
+        for review in reviews:
+            review.pk = pks[review.author.pk]
+        Title.objects.filter(pk=title.pk).add_score(
+            sum(review.score for review in reviews), len(reviews)
+        )
+        bump('review')
+        return reviews
+
+
+class CommentBulkMixin(AuthoredBulkMixin):
+    """Пакетное создание комментариев к отзыву."""
+
+    bulk_serializer_class = BulkCommentSerializer
+
+    def validate_bulk(self, items):
+        self.bulk_review = get_object_or_404(
+            Review, pk=self.kwargs.get('review_id')
+        )
+        return self.validate_authors(items)
+
+    def perform_bulk_create(self, items):
+        comments = Comment.objects.bulk_create(
+            Comment(review=self.bulk_review, **item) for item in items
+        )
+        assign_pks(comments, Comment.objects.filter(review=self.bulk_review))
+        bump('comment')
+        return comments
@@ -0,0 +1,57 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def response_cache_key(prefix, request, versions):
+    """Ключ кэша ответа по адресу, формату и версиям данных.
+
+    Запись в данные меняет версию, поэтому старые записи кэша сразу
+    перестают находиться и вытесняются бэкендом кэша. Дата изменения
+    версии защищает от совпадения ключей после пересоздания базы.
+    """
+    parts = [
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        *(
+            f'{name}:{version}:{modified}'
+            for name, (version, modified) in sorted(versions.items())
+        ),
+    ]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f'response:{prefix}:{digest}'
+
+
+def get_cached(key):
+    data = cache.get(key)
+    _incr(MISSES_KEY if data is None else HITS_KEY)
+    return data
+
+
+def set_cached(key, data):
+    cache.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def cache_stats():
+    """Возвращает счётчики попаданий и промахов кэша ответов."""
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    hits = stats.get(HITS_KEY, 0)
+    misses = stats.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
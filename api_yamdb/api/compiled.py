@@ -0,0 +1,102 @@
+from operator import attrgetter
+
+from django.db.models import Manager
+from rest_framework import serializers
+
+_compiled = {}
+
+
+class NotCompilable(Exception):
+    """Сериализатор нельзя скомпилировать, нужен обычный вывод DRF."""
+
+
+def get_compiled(serializer_class):
+    """Возвращает скомпилированную функцию вывода или None."""
+    if serializer_class not in _compiled:
+        try:
+            _compiled[serializer_class] = compile_serializer(
+                serializer_class()
+            )
+        except NotCompilable:
+            _compiled[serializer_class] = None
+    return _compiled[serializer_class]
+
+
+def compile_serializer(serializer):
+    """Собирает функцию, повторяющую to_representation сериализатора.
+
+    Поля разбираются один раз: для каждого заранее выбирается способ
+    чтения атрибута и преобразования значения, вложенные сериализаторы
+    компилируются рекурсивно. Результат совпадает с выводом DRF.
+    """
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    readers = tuple(
+        (field.field_name, _compile_field(field, model))
+        for field in serializer._readable_fields
+    )
+
+    def to_representation(instance):
+        return {name: read(instance) for name, read in readers}
+
+    return to_representation
+
+
+def _compile_field(field, model):
+    if isinstance(field, (
+        serializers.SerializerMethodField,
+        serializers.HyperlinkedRelatedField,
+    )):
+        raise NotCompilable(field.field_name)
+    if _is_plain_pk(field, model):
+        get = attrgetter(model._meta.get_field(field.source).attname)
+
+        def convert(value):
+            return value
+    else:
+        get = _compile_getter(field, model)
+        convert = _compile_converter(field)
+
+    def read(instance):
+        value = get(instance)
+        return None if value is None else convert(value)
+
+    return read
+
+
+def _compile_converter(field):
+    if isinstance(field, serializers.ListSerializer):
+        child = compile_serializer(field.child)
+
+        def convert(value):
+            if isinstance(value, Manager):
+                value = value.all()
+            return [child(item) for item in value]
+        return convert
+    if isinstance(field, serializers.BaseSerializer):
+        return compile_serializer(field)
+    if isinstance(field, serializers.ManyRelatedField):
+        child = field.child_relation.to_representation
+
+        def convert(value):
+            return [child(item) for item in value.all()]
+        return convert
+    return field.to_representation
+
+
+def _compile_getter(field, model):
+    if (
+        model is not None
+        and len(field.source_attrs) == 1
+        and not callable(getattr(model, field.source_attrs[0], None))
+    ):
+        return attrgetter(field.source_attrs[0])
+    return field.get_attribute
+
+
+def _is_plain_pk(field, model):
+    return (
+        isinstance(field, serializers.PrimaryKeyRelatedField)
+        and field.pk_field is None
+        and model is not None
+        and len(field.source_attrs) == 1
+    )
@@ -0,0 +1,124 @@
+import csv
+from datetime import datetime
+from io import StringIO
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from reviews.filters import (
+    CommentExportFilter, ReviewExportFilter, TitleFilter, UserFilter
+)
+from reviews.models import Comment, Review, Title, User
+
+
+class Export:
+    """Описание выгрузки: queryset, колонки и фильтр.
+
+    lookups — поля для values_list; convert, если задан, превращает
+    выбранные значения в строку выгрузки с колонками header.
+    """
+
+    def __init__(self, queryset, header, lookups, filterset_class,
+                 convert=None):
+        self.queryset = queryset
+        self.header = header
+        self.lookups = lookups
+        self.filterset_class = filterset_class
+        self.convert = convert
+
+    def rows(self, queryset):
+        """Строки выгрузки, читаемые из базы частями."""
+        rows = queryset.order_by('pk').values_list(*self.lookups).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE
+        )
+        if self.convert is None:
+            return rows
+        return map(self.convert, rows)
+
+
+def title_row(row):
+    """Строка выгрузки произведения со средней оценкой."""
+    *fields, rating_sum, rating_count = row
+    rating = rating_sum / rating_count if rating_count else None
+    return (*fields, rating, rating_count)
+
+
+EXPORTS = {
+    'reviews': Export(
+        Review.objects.all(),
+        ('id', 'title_id', 'author', 'text', 'score', 'pub_date'),
+        ('id', 'title_id', 'author__username', 'text', 'score', 'pub_date'),
+        ReviewExportFilter,
+    ),
+    'comments': Export(
+        Comment.objects.all(),
+        ('id', 'review_id', 'title_id', 'author', 'text', 'pub_date'),
+        (
+            'id', 'review_id', 'review__title_id', 'author__username',
+            'text', 'pub_date',
+        ),
+        CommentExportFilter,
+    ),
+    'titles': Export(
+        Title.objects.all(),
+        (
+            'id', 'name', 'year', 'category', 'description', 'rating',
+            'rating_count',
+        ),
+        (
+            'id', 'name', 'year', 'category__slug', 'description',
+            'rating_sum', 'rating_count',
+        ),
+        TitleFilter,
+        convert=title_row,
+    ),
+    'users': Export(
+        User.objects.all(),
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        UserFilter,
+    ),
+}
+
+
+def batches(rows):
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, settings.EXPORT_CHUNK_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(header, rows):
+    """Отдаёт csv частями: заголовок, затем по части строк за раз."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    for batch in batches(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(header, rows):
+    """Отдаёт NDJSON: по объекту JSON на строку."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for batch in batches(rows):
+        yield ''.join(
+            encoder.encode(dict(zip(header, row))) + '\n' for row in batch
+        )
+
+
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
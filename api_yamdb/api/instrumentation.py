@@ -0,0 +1,204 @@
+import cProfile
+import io
+import pstats
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+# Число строк отчёта профилировщика, отсортированного по общему времени.
+PROFILE_LINES = 30
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса: время, SQL и сериализация."""
+
+    def __init__(self, request):
+        self.request = request
+        self.method = request.method
+        self.route = None
+        self.status = None
+        self.wall = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer = None
+        self.profile = None
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка execute_wrapper, считающая запросы и их время."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - start
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing в миллисекундах."""
+        return ', '.join((
+            f'total;dur={self.wall * 1000:.2f}',
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} sql"',
+            f'serializer;dur={self.serializer_time * 1000:.2f}',
+        ))
+
+    def as_dict(self):
+        return {
+            'route': self.route,
+            'method': self.method,
+            'status': self.status,
+            'wall_ms': round(self.wall * 1000, 3),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_time * 1000, 3),
+            'serializer_ms': round(self.serializer_time * 1000, 3),
+        }
+
+
+@contextmanager
+def timed_serialization(name):
+    """Учитывает время блока как вывод сериализатора name в запросе."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    outer = metrics.serializer
+    metrics.serializer = name
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializer = outer
+
+
+def instrument_serializer(serializer):
+    """Добавляет к выводу корневого сериализатора учёт времени.
+
+    Обёртка ставится на to_representation экземпляра, поэтому вложенные
+    сериализаторы и сериализаторы вне представлений не затрагиваются.
+    """
+    name = type(getattr(serializer, 'child', serializer)).__name__
+    to_representation = serializer.to_representation
+
+    def timed(instance):
+        with timed_serialization(name):
+            return to_representation(instance)
+
+    serializer.to_representation = timed
+    return serializer
+
+
+def route_name(request):
+    """Имя маршрута запроса, например `titles-list`."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.url_name or match.route
+
+
+def should_profile(request):
+    """Профилировать ли запрос: по доле запросов или по заголовку."""
+    token = settings.PROFILE_HEADER_TOKEN
+    header = request.headers.get('X-Profile')
+    if token and header and constant_time_compare(header, token):
+        return True
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def profile_report(profiler):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats('cumulative').print_stats(PROFILE_LINES)
+    return stream.getvalue()
+
+
+def run_profiled(function, *args):
+    """Вызывает function под cProfile, возвращает результат и отчёт."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = function(*args)
+    finally:
+        profiler.disable()
+    return result, profile_report(profiler)
+
+
+def percentile(values, share):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[share - 1]
+
+
+class RollingReport:
+    """Последние замеры запросов процесса в памяти.
+
+    Хранит INSTRUMENTATION_REPORT_SIZE последних запросов и
+    INSTRUMENTATION_PROFILES последних отчётов профилировщика; у каждого
+    процесса сервера свой отчёт.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.entries = deque(maxlen=settings.INSTRUMENTATION_REPORT_SIZE)
+            self.profiles = deque(maxlen=settings.INSTRUMENTATION_PROFILES)
+
+    def add(self, metrics):
+        entry = metrics.as_dict()
+        with self.lock:
+            self.entries.append(entry)
+            if metrics.profile is not None:
+                self.profiles.append({**entry, 'profile': metrics.profile})
+
+    def routes(self):
+        """Сводка по маршрутам: число запросов, перцентили и средние."""
+        with self.lock:
+            entries = list(self.entries)
+        grouped = {}
+        for entry in entries:
+            grouped.setdefault(entry['route'], []).append(entry)
+        summary = []
+        for route, items in sorted(grouped.items()):
+            wall = sorted(item['wall_ms'] for item in items)
+            count = len(items)
+            summary.append({
+                'route': route,
+                'count': count,
+                'p50_ms': round(percentile(wall, 50), 3),
+                'p95_ms': round(percentile(wall, 95), 3),
+                'max_ms': wall[-1],
+                'avg_sql_count': round(
+                    sum(item['sql_count'] for item in items) / count, 2
+                ),
+                'avg_sql_ms': round(
+                    sum(item['sql_ms'] for item in items) / count, 3
+                ),
+                'avg_serializer_ms': round(
+                    sum(item['serializer_ms'] for item in items) / count, 3
+                ),
+            })
+        return summary
+
+    def as_dict(self, recent=20):
+        with self.lock:
+            latest = list(self.entries)[-recent:] if recent else []
+            profiles = list(self.profiles)
+        return {
+            'routes': self.routes(),
+            'recent': latest,
+            'profiles': profiles,
+        }
+
+
+report = RollingReport()
@@ -0,0 +1,250 @@
+import glob
+import ipaddress
+import json
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+COUNTERS = {
+    'yamdb_http_requests_total': 'Число запросов по маршруту, методу '
+                                 'и статусу.',
+    'yamdb_response_cache_requests_total': 'Обращения к кэшу ответов.',
+}
+HISTOGRAMS = {
+    'yamdb_http_request_duration_seconds': (
+        'Время обработки запроса.', LATENCY_BUCKETS,
+    ),
+    'yamdb_db_queries_per_request': (
+        'Число запросов к базе за запрос.', QUERY_COUNT_BUCKETS,
+    ),
+    'yamdb_db_duration_seconds': (
+        'Время запросов к базе за запрос.', LATENCY_BUCKETS,
+    ),
+}
+
+
+class MetricsStore:
+    """Счётчики и гистограммы процесса.
+
+    Запись идёт в словари процесса под коротким замком. Если задан
+    METRICS_DIR, процесс не чаще раза в METRICS_FLUSH_SECONDS
+    сохраняет свои значения в отдельный файл каталога, а /metrics
+    складывает файлы всех процессов, поэтому значения перезапущенных
+    обработчиков не теряются. Каталог очищают при развёртывании.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.pid = os.getpid()
+            self.name = f'metrics-{self.pid}-{uuid.uuid4().hex[:8]}.json'
+            self.counters = {}
+            self.histograms = {}
+            self.flushed = 0.0
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * len(buckets) + [0, 0]
+        for idx, bound in enumerate(buckets):
+            if value <= bound:
+                histogram[idx] += 1
+                break
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def check_pid(self):
+        if os.getpid() != self.pid:
+            # Процесс получен fork от родителя с уже набранными данными.
+            self.clear()
+
+    def observe_cache(self, hit):
+        """Учитывает обращение к кэшу ответов из ResponseCacheMixin."""
+        self.check_pid()
+        result = (('result', 'hit' if hit else 'miss'),)
+        with self.lock:
+            self.inc('yamdb_response_cache_requests_total', result)
+
+    def observe_request(self, metrics):
+        """Учитывает замеры запроса из InstrumentationMiddleware."""
+        self.check_pid()
+        route = (('route', metrics.route),)
+        with self.lock:
+            self.inc('yamdb_http_requests_total', route + (
+                ('method', metrics.method), ('status', str(metrics.status)),
+            ))
+            self.observe(
+                'yamdb_http_request_duration_seconds',
+                route + (('method', metrics.method),), metrics.wall,
+            )
+            self.observe(
+                'yamdb_db_queries_per_request', route, metrics.sql_count
+            )
+            self.observe('yamdb_db_duration_seconds', route, metrics.sql_time)
+        if settings.METRICS_DIR and (
+            time.monotonic() - self.flushed >= settings.METRICS_FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                'histograms': [
+                    [name, list(labels), list(values)]
+                    for (name, labels), values in self.histograms.items()
+                ],
+            }
+
+    def flush(self):
+        """Атомарно записывает значения процесса в METRICS_DIR."""
+        self.flushed = time.monotonic()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, self.name)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Значения всех процессов: файлы каталога и свои текущие."""
+        snapshots = [self.snapshot()]
+        if settings.METRICS_DIR:
+            own = os.path.join(settings.METRICS_DIR, self.name)
+            for path in glob.glob(
+                os.path.join(settings.METRICS_DIR, 'metrics-*.json')
+            ):
+                if path != own:
+                    snapshots.append(read_snapshot(path))
+        return merge(snapshots)
+
+
+def read_snapshot(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get('counters', ()):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot.get('histograms', ()):
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(values))
+            for idx, value in enumerate(values):
+                total[idx] += value
+    return counters, histograms
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{escape(value)}"' for name, value in labels)
+    return f'{{{pairs}}}'
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def histogram_lines(name, labels, values):
+    buckets = HISTOGRAMS[name][1]
+    cumulative = 0
+    for bound, count in zip(buckets, values):
+        cumulative += count
+        yield (
+            f'{name}_bucket{format_labels(labels + (("le", bound),))} '
+            f'{cumulative}'
+        )
+    yield (
+        f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} '
+        f'{values[-1]}'
+    )
+    yield f'{name}_sum{format_labels(labels)} {format_value(values[-2])}'
+    yield f'{name}_count{format_labels(labels)} {values[-1]}'
+
+
+def cache_ratio_lines(counters):
+    """Доля попаданий по уже сложенным счётчикам всех процессов."""
+    name = 'yamdb_response_cache_requests_total'
+    hits = counters.get((name, (('result', 'hit'),)), 0)
+    total = hits + counters.get((name, (('result', 'miss'),)), 0)
+    name = 'yamdb_response_cache_hit_ratio'
+    yield f'# HELP {name} Доля попаданий в кэш ответов.'
+    yield f'# TYPE {name} gauge'
+    yield f'{name} {hits / total if total else "NaN"}'
+
+
+def render_text(counters, histograms):
+    """Текст в формате Prometheus 0.0.4."""
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        lines += [
+            f'{name}{format_labels(labels)} {format_value(value)}'
+            for (key, labels), value in sorted(counters.items())
+            if key == name
+        ]
+    for name, (help_text, _) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (key, labels), values in sorted(histograms.items()):
+            if key == name:
+                lines += histogram_lines(name, labels, values)
+    lines += cache_ratio_lines(counters)
+    return '\n'.join(lines) + '\n'
+
+
+store = MetricsStore()
+
+
+def scrape_allowed(request):
+    """Можно ли отдать /metrics: по токену Bearer или адресу клиента.
+
+    Без METRICS_TOKEN и METRICS_ALLOWED_IPS метрики закрыты для всех.
+    """
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    if token and constant_time_compare(header, f'Bearer {token}'):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_IPS
+    )
@@ -0,0 +1,76 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import (
+    RequestMetrics, current_metrics, report, route_name, run_profiled,
+    should_profile
+)
+from .metrics import store
+from .nplusone import NPlusOneDetector
+
+
+class InstrumentationMiddleware:
+    """Замеры каждого запроса: время, SQL, сериализация и маршрут.
+
+    Результат отдаётся в заголовке Server-Timing, попадает в отчёт
+    instrumentation.report и в метрики Prometheus (api.metrics). Часть
+    запросов (PROFILE_SAMPLE_RATE) и запросы с заголовком X-Profile,
+    равным PROFILE_HEADER_TOKEN, выполняются под cProfile. Запросы к
+    базе при чтении потокового ответа происходят после выхода из
+    middleware и не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(request)
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query)
+                    )
+                if should_profile(request):
+                    response, metrics.profile = run_profiled(
+                        self.get_response, request
+                    )
+                else:
+                    response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        metrics.wall = time.perf_counter() - start
+        metrics.route = route_name(request)
+        metrics.status = response.status_code
+        response['Server-Timing'] = metrics.server_timing()
+        report.add(metrics)
+        store.observe_request(metrics)
+        return response
+
+
+class NPlusOneMiddleware:
+    """Поиск N+1: одинаковых запросов, отличающихся только параметрами.
+
+    Включается настройкой NPLUSONE_MODE для разработки и тестового
+    стенда: 'warn' пишет предупреждения в журнал api.nplusone, 'strict'
+    выбрасывает NPlusOneError на повторе номер NPLUSONE_THRESHOLD.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.NPLUSONE_MODE:
+            return self.get_response(request)
+        detector = NPlusOneDetector(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(detector))
+            response = self.get_response(request)
+        detector.warn()
+        return response
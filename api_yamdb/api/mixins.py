@@ -1,11 +1,33 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets, filters
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from reviews.versions import get_versions
 
+from .cache import get_cached, response_cache_key, set_cached
+from .instrumentation import instrument_serializer, timed_serialization
+from .metrics import store
 from .permissions import IsAdminIsSuperuser
+from .querysets import optimize_queryset
+from .values import get_values_reader
+
+
+class InstrumentedSerializerMixin:
+    """Миксин учёта времени сериализации в замерах запроса."""
+
+    def get_serializer(self, *args, **kwargs):
+        return instrument_serializer(
+            super().get_serializer(*args, **kwargs)
+        )
 
 
 class CustomViewSetMixin(
-    mixins.CreateModelMixin, mixins.ListModelMixin,
-    mixins.DestroyModelMixin, viewsets.GenericViewSet
+    InstrumentedSerializerMixin, mixins.CreateModelMixin,
+    mixins.ListModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet
 ):
     """Кастомный миксин для ViewSet c Create, List, Destroy методами."""
 
@@ -13,3 +35,143 @@ class CustomViewSetMixin(
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
     lookup_field = 'slug'
+
+
+class OptimizedQuerysetMixin:
+    """Миксин, подгружающий связанные данные по полям сериализатора."""
+
+    def filter_queryset(self, queryset):
+        return optimize_queryset(
+            super().filter_queryset(queryset),
+            self.get_serializer_class(),
+            defer=self.request.method in SAFE_METHODS,
+        )
+
+
+class VersionedViewMixin:
+    """Миксин доступа к счётчикам версий данных представления."""
+
+    version_collections = ()
+
+    def get_content_versions(self, names=None):
+        """Версии наборов данных, прочитанные за запрос не более раза."""
+        names = self.version_collections if names is None else names
+        known = self.__dict__.setdefault('_content_versions', {})
+        missing = [name for name in names if name not in known]
+        if missing:
+            known.update(get_versions(missing))
+        return {name: known[name] for name in names}
+
+
+class ConditionalGetMixin(VersionedViewMixin):
+    """Миксин условных GET-запросов по версиям данных.
+
+    ETag и Last-Modified считаются по счётчикам версий из
+    `version_collections` до выполнения основного запроса к базе.
+    Представления с детальным GET оборачивают retrieve в
+    `conditional_response` и могут задать свой набор счётчиков
+    `detail_version_collections`, поле версии объекта
+    `object_version_field` и поле даты его изменения
+    `object_modified_field` для Last-Modified.
+    """
+
+    detail_version_collections = None
+    object_version_field = None
+    object_modified_field = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, super().list, *args, **kwargs
+        )
+
+    def get_object_version(self):
+        """Версия объекта и дата его изменения (None, если поля нет)."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        fields = [self.object_version_field]
+        if self.object_modified_field:
+            fields.append(self.object_modified_field)
+        row = self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values_list(*fields).first() or (None,)
+        return row[0], row[1] if len(row) > 1 else None
+
+    def get_version_stamp(self, request):
+        collections = self.version_collections
+        if self.detail and self.detail_version_collections is not None:
+            collections = self.detail_version_collections
+        versions = self.get_content_versions(collections)
+        parts = [
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            *(f'{name}:{versions[name][0]}' for name in sorted(versions)),
+        ]
+        modified = [stamp for _, stamp in versions.values() if stamp]
+        if self.detail and self.object_version_field:
+            version, object_modified = self.get_object_version()
+            parts.append(f'object:{version}')
+            if object_modified:
+                modified.append(object_modified)
+        etag = quote_etag(
+            hashlib.md5('|'.join(parts).encode()).hexdigest()
+        )
+        # Заголовок точен до секунды: дробная часть сделала бы каждый
+        # If-Modified-Since устаревшим.
+        last_modified = int(max(modified).timestamp()) if modified else None
+        return etag, last_modified
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        etag, last_modified = self.get_version_stamp(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ResponseCacheMixin(VersionedViewMixin):
+    """Миксин кэширования ответов списка.
+
+    Ключ кэша включает версии `version_collections`, поэтому запись в
+    любую из этих таблиц сразу делает закэшированные ответы устаревшими.
+    """
+
+    def list(self, request, *args, **kwargs):
+        key = response_cache_key(
+            self.basename, request, self.get_content_versions()
+        )
+        data = get_cached(key)
+        store.observe_cache(data is not None)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_cached(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ValuesListMixin:
+    """Миксин вывода списка через values() без создания моделей.
+
+    Включается настройкой VALUES_READ_MODE. Если поля сериализатора
+    нельзя прочитать через values(), используется обычный вывод.
+    """
+
+    def list(self, request, *args, **kwargs):
+        reader = None
+        if settings.VALUES_READ_MODE:
+            reader = get_values_reader(self.get_serializer_class())
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+        queryset = reader.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        with timed_serialization(self.get_serializer_class().__name__):
+            data = reader.read(queryset if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,115 @@
+import logging
+import sys
+
+from django.conf import settings
+from django.db import models
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor, ReverseOneToOneDescriptor
+)
+from rest_framework import serializers
+
+from .instrumentation import route_name
+from .slow_queries import fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(Exception):
+    """Повторяющиеся запросы в строгом режиме детектора N+1."""
+
+
+def relation_name(obj):
+    """Связь модели, если obj — её дескриптор или менеджер."""
+    if isinstance(obj, ForwardManyToOneDescriptor):
+        return f'{obj.field.model.__name__}.{obj.field.name}'
+    if isinstance(obj, ReverseOneToOneDescriptor):
+        related = obj.related
+        return f'{related.model.__name__}.{related.get_accessor_name()}'
+    if isinstance(obj, models.Manager) and hasattr(obj, 'instance'):
+        name = getattr(obj, 'prefetch_cache_name', None)
+        if name is None:
+            name = obj.field.remote_field.get_accessor_name()
+        return f'{type(obj.instance).__name__}.{name}'
+    return None
+
+
+def serializer_field(frame):
+    """Поле, которое выводит Serializer.to_representation в кадре."""
+    serializer = frame.f_locals.get('self')
+    field = frame.f_locals.get('field')
+    if (frame.f_code.co_name != 'to_representation'
+            or not isinstance(serializer, serializers.Serializer)
+            or field is None):
+        return None
+    return f'{type(serializer).__name__}.{field.field_name}'
+
+
+def query_origin():
+    """Ближайшие к запросу поле сериализатора и связь модели по стеку.
+
+    Связь ищется среди дескрипторов и менеджеров в `self` и `data`
+    кадров: ListSerializer перебирает менеджер связи из `data`.
+    """
+    field = relation = None
+    frame = sys._getframe(1)
+    while frame is not None and (field is None or relation is None):
+        if relation is None:
+            for name in ('self', 'data'):
+                relation = relation_name(frame.f_locals.get(name))
+                if relation is not None:
+                    break
+        if field is None:
+            field = serializer_field(frame)
+        frame = frame.f_back
+    return field, relation
+
+
+class NPlusOneDetector:
+    """Считает одинаковые с точностью до параметров SELECT за запрос.
+
+    Источник запроса ищется по стеку один раз, на первом повторе. Когда
+    число повторов доходит до NPLUSONE_THRESHOLD, в строгом режиме
+    сразу выбрасывается NPlusOneError с трассировкой до места запроса.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            self.record(sql)
+        return execute(sql, params, many, context)
+
+    def record(self, sql):
+        key = fingerprint(sql)
+        statement = self.statements.setdefault(
+            key, {'count': 0, 'field': None, 'relation': None}
+        )
+        statement['count'] += 1
+        if statement['count'] == 2:
+            statement['field'], statement['relation'] = query_origin()
+        if (statement['count'] == settings.NPLUSONE_THRESHOLD
+                and settings.NPLUSONE_MODE == 'strict'):
+            raise NPlusOneError(self.message(key, statement))
+
+    def problems(self):
+        return [
+            (key, statement) for key, statement in self.statements.items()
+            if statement['count'] >= settings.NPLUSONE_THRESHOLD
+        ]
+
+    def message(self, key, statement):
+        origin = ', '.join(
+            f'{label} {statement[name]}'
+            for label, name in (('поле', 'field'), ('связь', 'relation'))
+            if statement[name]
+        ) or 'источник не найден'
+        return (
+            f'N+1 в {route_name(self.request)}: {statement["count"]} '
+            f'запросов вида «{key}»; {origin}.'
+        )
+
+    def warn(self):
+        for key, statement in self.problems():
+            logger.warning(self.message(key, statement))
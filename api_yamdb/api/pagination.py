@@ -0,0 +1,185 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(pagination.CursorPagination):
+    """Курсорная пагинация по ключу сортировки из представления.
+
+    В отличие от CursorPagination, курсор хранит значения всех полей
+    `cursor_ordering`, а страница выбирается составным условием по
+    ключу без OFFSET, даже если у многих строк совпадает первое поле.
+    Последнее поле сортировки должно быть уникальным.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+    def keyset_filter(self, position, reverse):
+        """Условие «строка идёт после position» в порядке выборки."""
+        condition, equal = Q(), {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor else None
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position, reverse))
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+
+        # Пустая страница за курсором ссылается на тот же курсор.
+        self.previous_position = self.next_position = position
+        if self.page:
+            self.previous_position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+            self.next_position = self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(pagination.Cursor(
+            offset=0, reverse=False, position=self.next_position
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(pagination.Cursor(
+            offset=0, reverse=True, position=self.previous_position
+        ))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(
+                b64decode(encoded.encode('ascii')).decode('ascii')
+            )
+            reverse = bool(int(tokens.get('r', ['0'])[0]))
+            position = json.loads(tokens['p'][0])
+        except (KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)
+                or not all(isinstance(value, str) for value in position)):
+            raise NotFound(self.invalid_cursor_message)
+        return pagination.Cursor(
+            offset=0, reverse=reverse, position=position
+        )
+
+    def encode_cursor(self, cursor):
+        tokens = {'p': json.dumps(cursor.position)}
+        if cursor.reverse:
+            tokens['r'] = '1'
+        encoded = b64encode(
+            parse.urlencode(tokens).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict):
+                position.append(str(instance[name]))
+            else:
+                position.append(str(getattr(instance, name)))
+        return position
+
+
+class KeysetPagination(pagination.BasePagination):
+    """Постраничная пагинация с переключением в курсорный режим.
+
+    Курсорный режим включается параметром `?pagination=cursor`, наличием
+    параметра `cursor` в запросе или атрибутом `pagination_mode = 'cursor'`
+    у представления. Представление должно задать `cursor_ordering`.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.page_number = pagination.PageNumberPagination()
+        self.cursor = KeysetCursorPagination()
+        self.active = self.page_number
+
+    @property
+    def display_page_controls(self):
+        return self.active.display_page_controls
+
+    def use_cursor(self, request, view):
+        if getattr(view, 'cursor_ordering', None) is None:
+            return False
+        return (
+            getattr(view, 'pagination_mode', None) == self.cursor_mode
+            or request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or self.cursor.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = (
+            self.cursor if self.use_cursor(request, view)
+            else self.page_number
+        )
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_schema_fields(self, view):
+        return (
+            self.page_number.get_schema_fields(view)
+            + self.cursor.get_schema_fields(view)
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number.get_schema_operation_parameters(view)
+            + self.cursor.get_schema_operation_parameters(view)
+        )
@@ -0,0 +1,112 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+_plans = {}
+
+
+class QueryPlan:
+    """Набор select_related/prefetch_related/only для сериализатора."""
+
+    def __init__(self, model):
+        self.model = model
+        self.select = []
+        self.prefetch = {}
+        self.only = {model._meta.pk.name}
+        self.complete = True
+
+    def merge(self, name, nested):
+        """Добавляет план вложенного сериализатора по связи name."""
+        self.select.append(name)
+        self.select.extend(f'{name}__{item}' for item in nested.select)
+        self.prefetch.update(
+            (f'{name}__{lookup}', plan)
+            for lookup, plan in nested.prefetch.items()
+        )
+        self.only.add(name)
+        self.only.update(f'{name}__{item}' for item in nested.only)
+        self.complete = self.complete and nested.complete
+
+    def apply(self, queryset, defer=True):
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*(
+                Prefetch(
+                    lookup,
+                    queryset=plan.apply(plan.model._default_manager.all())
+                )
+                for lookup, plan in self.prefetch.items()
+            ))
+        if defer and self.complete:
+            # Связанные менеджеры (title.reviews) проставляют известный
+            # родительский объект по внешнему ключу, его нельзя откладывать.
+            queryset = queryset.only(*self.only, *(
+                field.name for field in queryset._known_related_objects
+            ))
+        return queryset
+
+
+def get_query_plan(serializer_class):
+    """Строит и кэширует план запроса по полям сериализатора."""
+    if serializer_class not in _plans:
+        _plans[serializer_class] = _build_plan(serializer_class())
+    return _plans[serializer_class]
+
+
+def _build_plan(serializer):
+    meta = serializer.Meta
+    plan = QueryPlan(meta.model)
+    extra = getattr(meta, 'extra_query_fields', None)
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if len(field.source_attrs) != 1:
+            plan.complete = False
+            continue
+        name = field.source_attrs[0]
+        try:
+            model_field = meta.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if extra is None:
+                plan.complete = False
+            continue
+        _add_field(plan, name, model_field, field)
+    if extra:
+        plan.only.update(extra)
+    return plan
+
+
+def _add_field(plan, name, model_field, field):
+    if isinstance(field, serializers.ListSerializer):
+        plan.prefetch[name] = _build_plan(field.child)
+    elif isinstance(field, serializers.ManyRelatedField):
+        plan.prefetch[name] = _related_plan(
+            model_field.related_model, field.child_relation
+        )
+    elif isinstance(field, serializers.BaseSerializer):
+        plan.merge(name, _build_plan(field))
+    elif isinstance(field, serializers.PrimaryKeyRelatedField):
+        plan.only.add(name)
+    elif isinstance(field, serializers.RelatedField):
+        plan.merge(name, _related_plan(model_field.related_model, field))
+    elif model_field.concrete:
+        plan.only.add(name)
+
+
+def _related_plan(model, field):
+    plan = QueryPlan(model)
+    if isinstance(field, serializers.SlugRelatedField):
+        plan.only.add(field.slug_field)
+    elif not isinstance(field, serializers.PrimaryKeyRelatedField):
+        plan.complete = False
+    return plan
+
+
+def optimize_queryset(queryset, serializer_class, defer=True):
+    """Подгружает связанные данные, нужные сериализатору, заранее.
+
+    При defer=False выборка полей через only() не применяется: так
+    экземпляры, которые будут сохраняться, загружаются целиком.
+    """
+    return get_query_plan(serializer_class).apply(queryset, defer)
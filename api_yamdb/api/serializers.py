@@ -1,8 +1,26 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from reviews.models import (
-    REGEX, User, Review, Comment, Category, Genre, Title
+    REGEX, User, Review, Comment, Category, Genre, Title, ImportJob
 )
+from reviews.validators import validate_year
+
+from .compiled import get_compiled
+
+
+class CompiledSerializerMixin:
+    """Миксин быстрого вывода через скомпилированную функцию.
+
+    Включается настройкой COMPILED_SERIALIZERS.
+    """
+
+    def to_representation(self, instance):
+        if settings.COMPILED_SERIALIZERS:
+            compiled = get_compiled(type(self))
+            if compiled is not None:
+                return compiled(instance)
+        return super().to_representation(instance)
 
 
 class SignUpSerializer(serializers.Serializer):
@@ -103,11 +121,12 @@ class TitlePostSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'version', 'modified')
         model = Title
 
 
-class TitleGetSerializer(serializers.ModelSerializer):
+class TitleGetSerializer(CompiledSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор для GET-запросов произведений."""
 
     category = CategorySerializer(read_only=True)
@@ -118,11 +137,24 @@ class TitleGetSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'version', 'modified')
+        extra_query_fields = ('rating_sum', 'rating_count')
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class FuzzySearchSerializer(serializers.Serializer):
+    """Параметры нечёткого поиска произведений."""
+
+    query = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=50,
+        default=10,
+    )
+
+
+class ReviewSerializer(CompiledSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор отзывов."""
 
     author = serializers.SlugRelatedField(
@@ -132,7 +164,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        exclude = ['title']
+        exclude = ['title', 'modified']
         read_only_fields = ['pub_date']
 
     def validate(self, data):
@@ -149,7 +181,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(CompiledSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор комментариев."""
 
     author = serializers.SlugRelatedField(
@@ -160,3 +193,70 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    """Элемент пакетного создания произведений.
+
+    Связи и уникальность названия проверяются пачкой в представлении.
+    """
+
+    name = serializers.CharField(max_length=200)
+    year = serializers.IntegerField(min_value=0, validators=[validate_year])
+    category = serializers.SlugField(max_length=50)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=50),
+        allow_empty=True,
+    )
+    description = serializers.CharField(
+        max_length=200,
+        required=False,
+        allow_blank=True,
+        default='',
+    )
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """Элемент пакетного создания отзывов."""
+
+    text = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+    )
+    score = serializers.IntegerField(min_value=1, max_value=10)
+    author = serializers.RegexField(
+        regex=REGEX,
+        max_length=150,
+        required=False,
+    )
+
+
+class BulkCommentSerializer(serializers.Serializer):
+    """Элемент пакетного создания комментариев."""
+
+    text = serializers.CharField(max_length=300)
+    author = serializers.RegexField(
+        regex=REGEX,
+        max_length=150,
+        required=False,
+    )
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Задача фонового импорта csv-файла."""
+
+    csv_file = serializers.FileField(source='file', write_only=True)
+    rows_per_second = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = (
+            'id', 'csv_file', 'status', 'chunks_done', 'rows_processed',
+            'rows_invalid', 'rows_per_second', 'stats', 'error', 'created',
+            'finished',
+        )
+        read_only_fields = (
+            'status', 'chunks_done', 'rows_processed', 'rows_invalid',
+            'stats', 'error', 'created', 'finished',
+        )
@@ -0,0 +1,155 @@
+import json
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .instrumentation import current_metrics, route_name
+
+LITERALS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql):
+    """SQL без литералов и параметров: одинаковый у однотипных запросов."""
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def view_name(request):
+    """Класс и действие представления, например `TitleViewSet.list`."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = getattr(match.func, 'cls', match.func)
+    name = f'{view.__module__}.{view.__qualname__}'
+    actions = getattr(match.func, 'actions', None)
+    if actions and request.method.lower() in actions:
+        name += f'.{actions[request.method.lower()]}'
+    return name
+
+
+def explain(connection, sql, params):
+    """План запроса: EXPLAIN QUERY PLAN в SQLite, EXPLAIN в остальных.
+
+    Запрос идёт через курсор драйвера в обход execute_wrappers, поэтому
+    не попадает в замеры и не читает результаты исходного курсора.
+    Точка сохранения ограничивает откат ошибки EXPLAIN, чтобы она не
+    прерывала транзакцию запроса; её команды тоже идут без обёрток.
+    """
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    prefix = connection.ops.explain_query_prefix()
+    wrappers = connection.execute_wrappers
+    connection.execute_wrappers = []
+    try:
+        with transaction.atomic(using=connection.alias):
+            cursor = connection.create_cursor()
+            try:
+                cursor.execute(f'{prefix} {sql}', params)
+                return [str(row[-1]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error}']
+    finally:
+        connection.execute_wrappers = wrappers
+
+
+class SlowQueryLog:
+    """Медленные запросы: кольцевой буфер и, если задан, файл.
+
+    Буфер хранит SLOW_QUERY_LOG_SIZE последних записей процесса; файл
+    SLOW_QUERY_LOG_FILE получает по строке JSON на запрос.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.entries = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+
+    def add(self, entry):
+        with self.lock:
+            self.entries.append(entry)
+            if settings.SLOW_QUERY_LOG_FILE:
+                with open(
+                    settings.SLOW_QUERY_LOG_FILE, 'a', encoding='utf-8'
+                ) as file:
+                    file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def fingerprints(self, entries):
+        """Сводка по отпечаткам: число, худшее время и пример."""
+        grouped = {}
+        for entry in entries:
+            item = grouped.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'], 'count': 0,
+                'max_ms': 0, 'routes': set(),
+            })
+            item['count'] += 1
+            if entry['duration_ms'] >= item['max_ms']:
+                item.update(max_ms=entry['duration_ms'], example=entry)
+            item['routes'].add(entry['route'])
+        for item in grouped.values():
+            item['routes'] = sorted(item['routes'], key=str)
+        return sorted(grouped.values(), key=lambda item: -item['max_ms'])
+
+    def as_dict(self):
+        with self.lock:
+            entries = list(self.entries)
+        return {
+            'queries': entries[::-1],
+            'fingerprints': self.fingerprints(entries),
+        }
+
+
+def record(connection, sql, params, many, duration):
+    metrics = current_metrics.get()
+    request = getattr(metrics, 'request', None)
+    entry = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration * 1000, 3),
+        'fingerprint': fingerprint(sql),
+        'sql': sql,
+        'route': route_name(request) if request is not None else None,
+        'view': view_name(request) if request is not None else None,
+        'serializer': getattr(metrics, 'serializer', None),
+        'plan': None,
+    }
+    if settings.SLOW_QUERY_EXPLAIN and not many:
+        entry['plan'] = explain(connection, sql, params)
+    log.add(entry)
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """Обёртка execute_wrapper, записывающая запросы дольше порога."""
+    threshold = settings.SLOW_QUERY_SECONDS
+    if threshold is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+    if duration >= threshold:
+        record(context['connection'], sql, params, many, duration)
+    return result
+
+
+def install(sender, connection, **kwargs):
+    """Приёмник connection_created: подключает обёртку к соединению."""
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, slow_query_wrapper)
+
+
+log = SlowQueryLog()
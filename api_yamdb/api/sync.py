@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from reviews.models import Tombstone
+
+from .exports import EXPORTS
+
+# Наборы данных, доступные для синхронизации.
+SYNC_COLLECTIONS = ('titles', 'reviews', 'comments')
+
+# Изменения и удаления идут в одном потоке, упорядоченном по
+# (время, ранг, ключ); при равном времени изменения идут раньше.
+UPSERT, DELETE = 0, 1
+
+
+class SyncError(ValueError):
+    """Неверный курсор или параметр синхронизации."""
+
+
+def encode_cursor(key):
+    moment, rank, pk = key
+    raw = json.dumps([moment.isoformat(), rank, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        moment, rank, pk = json.loads(base64.urlsafe_b64decode(cursor))
+        moment = parse_datetime(moment)
+    except (binascii.Error, TypeError, ValueError):
+        raise SyncError('Неверный курсор.')
+    if moment is None or not isinstance(pk, int) or rank not in (-1, 0, 1):
+        raise SyncError('Неверный курсор.')
+    return moment, rank, pk
+
+
+def after(key, time_field, rank, pk_field):
+    """Условие «строка потока с рангом rank идёт после курсора key»."""
+    moment, cursor_rank, pk = key
+    condition = Q(**{f'{time_field}__gt': moment})
+    if rank > cursor_rank:
+        return condition | Q(**{time_field: moment})
+    if rank == cursor_rank:
+        return condition | Q(**{time_field: moment, f'{pk_field}__gt': pk})
+    return condition
+
+
+def start_key(cursor=None, since=None):
+    """Позиция в потоке по курсору или по дате `since` включительно."""
+    if cursor:
+        return decode_cursor(cursor)
+    if since:
+        moment = parse_datetime(since)
+        if moment is None:
+            raise SyncError('Неверная дата since.')
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment, -1, 0
+    return None
+
+
+def upserts(name, key, until, limit):
+    export = EXPORTS[name]
+    queryset = export.queryset.filter(modified__lte=until)
+    if key is not None:
+        queryset = queryset.filter(after(key, 'modified', UPSERT, 'id'))
+    rows = queryset.order_by('modified', 'id').values_list(
+        'modified', *export.lookups
+    )[:limit]
+    for modified, *values in rows:
+        if export.convert is not None:
+            values = export.convert(values)
+        data = dict(zip(export.header, values))
+        yield (modified, UPSERT, data['id']), {
+            'op': 'upsert', 'id': data['id'], 'modified': modified,
+            'data': data,
+        }
+
+
+def deletions(name, key, until, limit):
+    queryset = Tombstone.objects.filter(collection=name, deleted__lte=until)
+    if key is not None:
+        queryset = queryset.filter(after(key, 'deleted', DELETE, 'pk'))
+    rows = queryset.order_by('deleted', 'pk').values_list(
+        'pk', 'object_id', 'deleted'
+    )[:limit]
+    for pk, object_id, deleted in rows:
+        yield (deleted, DELETE, pk), {
+            'op': 'delete', 'id': object_id, 'modified': deleted,
+        }
+
+
+def changes(name, cursor=None, since=None, limit=None):
+    """Страница изменений набора name после курсора.
+
+    Берёт по limit + 1 строк из изменённых объектов и из отметок об
+    удалении, сливает их по позиции в потоке и обрезает до limit.
+    Свежие строки моложе SYNC_SETTLE_SECONDS не отдаются: транзакция,
+    начатая раньше, может зафиксироваться позже и получить меньшее
+    время, и курсор бы её пропустил.
+    Возвращает (изменения, курсор, есть ли ещё).
+    """
+    limit = limit or settings.SYNC_PAGE_SIZE
+    key = start_key(cursor, since)
+    until = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    stream = sorted(
+        [
+            *upserts(name, key, until, limit + 1),
+            *deletions(name, key, until, limit + 1),
+        ],
+        key=lambda item: item[0],
+    )
+    page = stream[:limit]
+    if page:
+        cursor = encode_cursor(page[-1][0])
+    elif key is not None and not cursor:
+        cursor = encode_cursor(key)
+    return [change for _, change in page], cursor, len(stream) > limit
@@ -3,7 +3,9 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     SignupViewSet, TokenObtainViewSet, UserViewSet, ReviewViewSet,
-    CommentViewSet, CategoryViewSet, GenreViewSet, TitleViewSet
+    CommentViewSet, CategoryViewSet, GenreViewSet, TitleViewSet,
+    CacheStatsView, ExportView, ImportJobViewSet, InstrumentationView,
+    SlowQueryView, SyncView
 )
 
 
@@ -12,6 +14,7 @@ v1_router.register(r'users', UserViewSet, basename='users')
 v1_router.register(r'categories', CategoryViewSet, basename='categories')
 v1_router.register(r'genres', GenreViewSet, basename='genres')
 v1_router.register(r'titles', TitleViewSet, basename='titles')
+v1_router.register(r'imports', ImportJobViewSet, basename='imports')
 v1_router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -30,5 +33,20 @@ auth_patterns = [
 
 urlpatterns = [
     path('v1/auth/', include(auth_patterns)),
+    path('v1/cache/stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path(
+        'v1/export/<slug:name>.<slug:extension>',
+        ExportView.as_view(),
+        name='export'
+    ),
+    path(
+        'v1/instrumentation/', InstrumentationView.as_view(),
+        name='instrumentation'
+    ),
+    path(
+        'v1/instrumentation/slow-queries/', SlowQueryView.as_view(),
+        name='slow_queries'
+    ),
+    path('v1/sync/<slug:name>/', SyncView.as_view(), name='sync'),
     path('v1/', include(v1_router.urls)),
 ]
@@ -0,0 +1,223 @@
+from collections import defaultdict
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F
+from rest_framework import serializers
+
+PARENT = 'values_parent'
+
+_readers = {}
+
+
+class NotReadable(Exception):
+    """Поле сериализатора нельзя получить через values()."""
+
+
+def get_values_reader(serializer_class):
+    """Возвращает ValuesReader для сериализатора или None."""
+    if serializer_class not in _readers:
+        try:
+            _readers[serializer_class] = ValuesReader(serializer_class())
+        except NotReadable:
+            _readers[serializer_class] = None
+    return _readers[serializer_class]
+
+
+class ValuesReader:
+    """Вывод сериализатора по строкам values() без создания моделей.
+
+    Колонки основной таблицы выбираются одним запросом, вложенные
+    объекты и списки подгружаются пачкой по всем строкам страницы.
+    Значения проходят через to_representation полей сериализатора,
+    поэтому результат совпадает с обычным выводом.
+    """
+
+    def __init__(self, serializer):
+        meta = serializer.Meta
+        self.model = meta.model
+        self.pk = self.model._meta.pk.attname
+        self.readers = [
+            (field.field_name, _field_reader(field, self.model))
+            for field in serializer._readable_fields
+        ]
+        columns = {self.pk}
+        for _, reader in self.readers:
+            columns.update(reader.columns)
+        columns.update(getattr(meta, 'extra_query_fields', ()))
+        self.columns = sorted(columns)
+
+    def values(self, queryset):
+        """Превращает queryset в values() с нужными колонками."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def read(self, rows):
+        rows = list(rows)
+        prepared = [
+            (name, reader, reader.prepare(rows))
+            for name, reader in self.readers
+        ]
+        return [
+            {
+                name: reader.value(row, context)
+                for name, reader, context in prepared
+            }
+            for row in rows
+        ]
+
+    def fetch(self, filters, extra=None):
+        """Строки связанной модели по фильтру, с доп. колонками extra."""
+        queryset = self.model._default_manager.filter(**filters)
+        if extra:
+            queryset = queryset.annotate(**extra)
+        rows = list(queryset.values(*self.columns, *(extra or ())))
+        return rows, self.read(rows)
+
+
+class Column:
+    """Обычное поле модели."""
+
+    def __init__(self, column, field):
+        self.columns = (column,)
+        self.column = column
+        self.convert = field.to_representation
+
+    def prepare(self, rows):
+        return None
+
+    def value(self, row, context):
+        value = row[self.column]
+        return None if value is None else self.convert(value)
+
+
+class RawColumn(Column):
+    """Колонка, значение которой выводится как есть."""
+
+    def __init__(self, column):
+        self.columns = (column,)
+        self.column = column
+
+    def value(self, row, context):
+        return row[self.column]
+
+
+class PropertyColumn:
+    """Свойство модели, вычисляемое по уже выбранным колонкам."""
+
+    columns = ()
+
+    def __init__(self, prop, field):
+        self.getter = prop.fget
+        self.convert = field.to_representation
+
+    def prepare(self, rows):
+        return None
+
+    def value(self, row, context):
+        value = self.getter(SimpleNamespace(**row))
+        return None if value is None else self.convert(value)
+
+
+class NestedColumn:
+    """Вложенный сериализатор по внешнему ключу."""
+
+    def __init__(self, model_field, child):
+        self.column = model_field.attname
+        self.columns = (self.column,)
+        self.child = ValuesReader(child)
+
+    def prepare(self, rows):
+        ids = {row[self.column] for row in rows} - {None}
+        if not ids:
+            return {}
+        child_rows, data = self.child.fetch({'pk__in': ids})
+        return {
+            child_row[self.child.pk]: item
+            for child_row, item in zip(child_rows, data)
+        }
+
+    def value(self, row, context):
+        return context.get(row[self.column])
+
+
+class ManyColumn:
+    """Список связанных объектов: M2M или обратный внешний ключ."""
+
+    def __init__(self, model, model_field, child):
+        self.pk = model._meta.pk.attname
+        self.columns = ()
+        if model_field.many_to_many and model_field.concrete:
+            self.query_name = model_field.related_query_name()
+        elif model_field.one_to_many:
+            self.query_name = model_field.field.name
+        else:
+            raise NotReadable(model_field.name)
+        self.child = child
+
+    def prepare(self, rows):
+        groups = defaultdict(list)
+        ids = {row[self.pk] for row in rows}
+        if not ids:
+            return groups
+        child_rows, data = self.child.fetch(
+            {f'{self.query_name}__in': ids},
+            {PARENT: F(self.query_name)},
+        )
+        for child_row, item in zip(child_rows, data):
+            groups[child_row[PARENT]].append(item)
+        return groups
+
+    def value(self, row, context):
+        return context.get(row[self.pk], [])
+
+
+class SlugReader:
+    """Чтение одного слаг-поля связанной модели для ManyColumn."""
+
+    def __init__(self, model, slug_field):
+        self.model = model
+        self.slug_field = slug_field
+        self.columns = [model._meta.pk.attname, slug_field]
+
+    def fetch(self, filters, extra):
+        rows = list(
+            self.model._default_manager.filter(**filters).annotate(
+                **extra
+            ).values(*self.columns, *extra)
+        )
+        return rows, [row[self.slug_field] for row in rows]
+
+
+def _field_reader(field, model):
+    if len(field.source_attrs) != 1:
+        raise NotReadable(field.field_name)
+    name = field.source_attrs[0]
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        prop = getattr(model, name, None)
+        if isinstance(prop, property):
+            return PropertyColumn(prop, field)
+        raise NotReadable(field.field_name)
+    if isinstance(field, serializers.ListSerializer):
+        return ManyColumn(model, model_field, ValuesReader(field.child))
+    if isinstance(field, serializers.ManyRelatedField):
+        child = field.child_relation
+        if not isinstance(child, serializers.SlugRelatedField):
+            raise NotReadable(field.field_name)
+        return ManyColumn(model, model_field, SlugReader(
+            model_field.related_model, child.slug_field
+        ))
+    if isinstance(field, serializers.BaseSerializer):
+        return NestedColumn(model_field, field)
+    return _related_reader(field, model_field)
+
+
+def _related_reader(field, model_field):
+    if isinstance(field, serializers.SlugRelatedField):
+        return RawColumn(f'{model_field.name}__{field.slug_field}')
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return RawColumn(model_field.attname)
+    if isinstance(field, serializers.RelatedField) or not model_field.concrete:
+        raise NotReadable(field.field_name)
+    return Column(model_field.attname, field)
@@ -1,30 +1,46 @@
-import csv
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db import IntegrityError
-from django.shortcuts import get_object_or_404, render
+from django.db import IntegrityError, transaction
+from django.http import (
+    HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+)
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, filters, viewsets, pagination
+from rest_framework import mixins, permissions, viewsets
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.decorators import action
 from rest_framework.generics import CreateAPIView
 from rest_framework.response import Response
-from django.db.models import Avg
+from rest_framework.views import APIView
 
-from reviews.filters import TitleFilter
-from reviews.models import User, Review, Category, Genre, Title
+from reviews.filters import TitleFilter, UserFilter
+from reviews.models import User, Review, Category, Genre, Title, ImportJob
+from reviews.search import similar_titles
 from .permissions import (
     IsAdminIsSuperuser, IsAuthorOrSuperUserOrReadOnly, IsAdminOrAllowGet
 )
 from .serializers import (
     SignUpSerializer, TokenObtainSerializer, UserSerializer, ReviewSerializer,
     CommentSerializer, CategorySerializer, GenreSerializer,
-    TitleGetSerializer, TitlePostSerializer,
+    TitleGetSerializer, TitlePostSerializer, FuzzySearchSerializer,
+    ImportJobSerializer,
+)
+from .bulk import CommentBulkMixin, ReviewBulkMixin, TitleBulkMixin
+from .cache import cache_stats
+from .exports import EXPORTS, FORMATS
+from .instrumentation import report
+from .metrics import render_text, scrape_allowed, store
+from .slow_queries import log as slow_query_log
+from .mixins import (
+    ConditionalGetMixin, CustomViewSetMixin, InstrumentedSerializerMixin,
+    OptimizedQuerysetMixin, ResponseCacheMixin, ValuesListMixin
 )
-from .mixins import CustomViewSetMixin
+from .pagination import KeysetPagination
+from .sync import SYNC_COLLECTIONS, SyncError, changes
 from .utils import send_confirmation_code
 
 
-class SignupViewSet(CreateAPIView):
+class SignupViewSet(InstrumentedSerializerMixin, CreateAPIView):
     """Регистрация с подтвердением по email."""
 
     serializer_class = SignUpSerializer
@@ -70,7 +86,7 @@ class TokenObtainViewSet(CreateAPIView):
         return Response(str(token), status=200)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(InstrumentedSerializerMixin, viewsets.ModelViewSet):
     """Представление для управления информацией пользователя."""
 
     queryset = User.objects.all()
@@ -78,9 +94,10 @@ class UserViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'patch', 'delete')
     permission_classes = (IsAdminIsSuperuser,)
-    pagination_class = pagination.PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('^username',)
+    pagination_class = KeysetPagination
+    cursor_ordering = ('username',)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = UserFilter
 
     @action(
         detail=False,
@@ -97,47 +114,97 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             serializer.save(role=request.user.role)
             return Response(serializer.data, status=200)
-        serializer = UserSerializer(request.user)
+        serializer = self.get_serializer(request.user)
         return Response(serializer.data, status=200)
 
 
-class CategoryViewSet(CustomViewSetMixin):
+class CategoryViewSet(
+    ConditionalGetMixin, ResponseCacheMixin, CustomViewSetMixin
+):
     """Представление для вывода списка категорий."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrAllowGet]
+    version_collections = ('category',)
 
 
-class GenreViewSet(CustomViewSetMixin):
+class GenreViewSet(
+    ConditionalGetMixin, ResponseCacheMixin, CustomViewSetMixin
+):
     """Представление для вывода списка жанров."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAdminOrAllowGet]
+    version_collections = ('genre',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin, ResponseCacheMixin, ValuesListMixin,
+    OptimizedQuerysetMixin, TitleBulkMixin, InstrumentedSerializerMixin,
+    viewsets.ModelViewSet
+):
     """Представление для вывода списка произведений."""
 
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')).order_by('id')
+    queryset = Title.objects.all().order_by('id')
     serializer_class = TitleFilter
     permission_classes = [IsAdminOrAllowGet]
     filter_backends = [DjangoFilterBackend]
     filterset_class = TitleFilter
+    cursor_ordering = ('id',)
+    version_collections = ('title', 'category', 'genre', 'review')
+    detail_version_collections = ('category', 'genre')
+    object_version_field = 'version'
+    object_modified_field = 'modified'
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleGetSerializer
         return TitlePostSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    @action(detail=False, url_path='facets', url_name='facets')
+    def facets(self, request):
+        """Количество произведений по жанрам, категориям и годам."""
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.get_queryset(),
+            request=request,
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        return Response(filterset.facets(), status=200)
+
+    @action(detail=False, url_path='fuzzy', url_name='fuzzy')
+    def fuzzy(self, request):
+        """Поиск произведений по названию с учётом опечаток."""
+        serializer = FuzzySearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        scores = similar_titles(**serializer.validated_data)
+        titles = self.filter_queryset(
+            self.get_queryset().filter(pk__in=scores)
+        )
+        titles = sorted(titles, key=lambda title: -scores[title.pk])
+        data = self.get_serializer(titles, many=True).data
+        for item in data:
+            item['similarity'] = round(scores[item['id']], 3)
+        return Response(data, status=200)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ResponseCacheMixin, ValuesListMixin, OptimizedQuerysetMixin,
+    ReviewBulkMixin, InstrumentedSerializerMixin, viewsets.ModelViewSet
+):
     """Представление для вывода списка отзывов."""
 
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthorOrSuperUserOrReadOnly]
+    cursor_ordering = ('-pub_date', '-id')
+    version_collections = ('review', 'user')
 
     def get_queryset(self):
         title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
@@ -147,12 +214,28 @@ class ReviewViewSet(viewsets.ModelViewSet):
         title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
         serializer.save(author=self.request.user, title=title)
 
+    def perform_update(self, serializer):
+        # Строка отзыва блокируется до конца транзакции, и рейтинг
+        # меняется на разницу с сохранённой оценкой: параллельное
+        # изменение того же отзыва ждёт и видит уже новую оценку.
+        with transaction.atomic():
+            serializer.instance._rating_state = (
+                Review.objects.select_for_update().values_list(
+                    'title_id', 'score'
+                ).get(pk=serializer.instance.pk)
+            )
+            serializer.save()
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ValuesListMixin, OptimizedQuerysetMixin, CommentBulkMixin,
+    InstrumentedSerializerMixin, viewsets.ModelViewSet
+):
     """Представление для вывода списка комментариев."""
 
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrSuperUserOrReadOnly,)
+    cursor_ordering = ('-pub_date', '-id')
 
     def get_queryset(self):
         review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
@@ -163,27 +246,148 @@ class CommentViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user, review=review)
 
 
-def import_csv(request):
-    """Импортирование csv-файлов в базу."""
-    if request.method == 'POST':
-        file = request.FILES['csv_file']
-        reader = csv.DictReader(file.read().decode('utf-8').splitlines())
-        for row in reader:
-            genre, _ = Genre.objects.get_or_create(
-                slug=row['genre_slug'],
-                defaults={'name': row['genre_name']}
-            )
-            category, _ = Category.objects.get_or_create(
-                slug=row['category_slug'],
-                defaults={'name': row['category_name']}
+class CacheStatsView(APIView):
+    """Счётчики попаданий и промахов кэша ответов."""
+
+    permission_classes = (IsAdminIsSuperuser,)
+
+    def get(self, request):
+        return Response(cache_stats(), status=200)
+
+
+class InstrumentationView(APIView):
+    """Сводка замеров последних запросов процесса по маршрутам.
+
+    Параметр `recent` задаёт число последних запросов в ответе;
+    DELETE очищает отчёт.
+    """
+
+    permission_classes = (IsAdminIsSuperuser,)
+
+    def get(self, request):
+        try:
+            recent = max(int(request.query_params.get('recent', 20)), 0)
+        except ValueError:
+            return Response({'recent': 'Ожидается число.'}, status=400)
+        return Response(report.as_dict(recent), status=200)
+
+    def delete(self, request):
+        report.clear()
+        return Response(status=204)
+
+
+class SlowQueryView(APIView):
+    """Медленные запросы к базе с планами и сводкой по отпечаткам.
+
+    DELETE очищает журнал процесса.
+    """
+
+    permission_classes = (IsAdminIsSuperuser,)
+
+    def get(self, request):
+        return Response(slow_query_log.as_dict(), status=200)
+
+    def delete(self, request):
+        slow_query_log.clear()
+        return Response(status=204)
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка таблицы в csv или NDJSON.
+
+    Строки читаются из базы частями и отдаются клиенту по мере чтения,
+    поэтому память не растёт с размером таблицы.
+    """
+
+    permission_classes = (IsAdminIsSuperuser,)
+
+    def get(self, request, name, extension):
+        export = EXPORTS.get(name)
+        if export is None or extension not in FORMATS:
+            return Response({'detail': 'Выгрузка не найдена.'}, status=404)
+        filterset = export.filterset_class(
+            request.query_params, queryset=export.queryset, request=request
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        stream, content_type = FORMATS[extension]
+        response = StreamingHttpResponse(
+            stream(export.header, export.rows(filterset.qs)),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{extension}"'
+        )
+        return response
+
+
+class SyncView(APIView):
+    """Изменения произведений, отзывов или комментариев после курсора.
+
+    Клиент передаёт курсор из прошлого ответа (или дату `since`) и
+    получает изменённые объекты и удаления по порядку их времени.
+    """
+
+    permission_classes = (IsAdminIsSuperuser,)
+
+    def get(self, request, name):
+        if name not in SYNC_COLLECTIONS:
+            return Response({'detail': 'Набор не найден.'}, status=404)
+        try:
+            limit = int(request.query_params.get('limit', 0))
+        except ValueError:
+            limit = -1
+        if not 0 <= limit <= settings.SYNC_PAGE_SIZE:
+            return Response(
+                {'limit': f'Число от 1 до {settings.SYNC_PAGE_SIZE}.'},
+                status=400,
             )
-            title, _ = Title.objects.get_or_create(
-                name=row['title_name'],
-                defaults={
-                    'slug': row['title_slug'],
-                    'genre': genre,
-                    'category': category,
-                }
+        try:
+            items, cursor, has_more = changes(
+                name,
+                cursor=request.query_params.get('cursor'),
+                since=request.query_params.get('since'),
+                limit=limit,
             )
-        return render(request, 'import_csv.html', {'success': True})
-    return render(request, 'import_csv.html')
+        except SyncError as error:
+            return Response({'detail': str(error)}, status=400)
+        return Response(
+            {'changes': items, 'cursor': cursor, 'has_more': has_more},
+            status=200,
+        )
+
+
+class ImportJobViewSet(
+    InstrumentedSerializerMixin, mixins.CreateModelMixin,
+    mixins.ListModelMixin, mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet
+):
+    """Фоновый импорт csv-файлов: постановка задачи и её статус.
+
+    Файл сохраняется на диск, задачу выполняет команда run_import_jobs.
+    """
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = (IsAdminIsSuperuser,)
+
+    def perform_create(self, serializer):
+        serializer.save(
+            author=self.request.user,
+            chunk_size=settings.IMPORT_CSV_CHUNK_SIZE,
+        )
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = 202
+        return response
+
+
+def metrics(request):
+    """Метрики всех процессов сервера в текстовом формате Prometheus."""
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_text(*store.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
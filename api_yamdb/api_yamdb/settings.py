@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.InstrumentationMiddleware',
+    'api.middleware.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,6 +75,19 @@ DATABASES = {
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Время жизни записи кэша ответов. Устаревание по записи в данные
+# обеспечивается версиями в ключе, таймаут лишь освобождает память.
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -110,6 +125,8 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+MEDIA_ROOT = BASE_DIR / 'media'
+
 AUTH_USER_MODEL = 'reviews.User'
 
 SIMPLE_JWT = {
@@ -129,10 +146,73 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_PAGINATION_CLASS':
-        'rest_framework.pagination.PageNumberPagination',
+        'api.pagination.KeysetPagination',
         'PAGE_SIZE': 5,
 }
 
+# Быстрый вывод произведений, отзывов и комментариев через
+# скомпилированные сериализаторы (api.compiled).
+COMPILED_SERIALIZERS = False
+
+# Вывод списков произведений, отзывов и комментариев через values()
+# без создания экземпляров моделей (api.values).
+VALUES_READ_MODE = False
+
+# Максимальное число объектов в одном запросе пакетного создания.
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Количество строк csv-файла, сохраняемых за один проход импорта.
+IMPORT_CSV_CHUNK_SIZE = 5000
+
+# Количество строк, читаемых из базы за раз при потоковой выгрузке.
+EXPORT_CHUNK_SIZE = 2000
+
+# Через сколько секунд без отметок обработчика задача импорта
+# считается брошенной и продолжается другим обработчиком.
+IMPORT_JOB_STALE_SECONDS = 300
+
+# Наибольшее число изменений на странице синхронизации (api.sync).
+SYNC_PAGE_SIZE = 500
+
+# Изменения моложе этого числа секунд синхронизация ещё не отдаёт:
+# транзакция, начатая раньше, может зафиксироваться позже.
+SYNC_SETTLE_SECONDS = 5
+
+# Замеры запросов (api.middleware.InstrumentationMiddleware): сколько
+# последних запросов и отчётов профилировщика хранить в памяти.
+INSTRUMENTATION_REPORT_SIZE = 1000
+INSTRUMENTATION_PROFILES = 20
+
+# Доля запросов, выполняемых под cProfile, и значение заголовка
+# X-Profile, включающее профилирование запроса; пустое — выключено.
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_HEADER_TOKEN = ''
+
+# Каталог, через который процессы сервера складывают метрики /metrics
+# (api.metrics), и как часто процесс сохраняет туда свои значения.
+# None — метрики только текущего процесса.
+METRICS_DIR = None
+METRICS_FLUSH_SECONDS = 5
+# Доступ к /metrics: токен заголовка `Authorization: Bearer <токен>` и
+# адреса или сети сборщика, например ('10.0.0.0/8',). По умолчанию
+# метрики закрыты.
+METRICS_TOKEN = ''
+METRICS_ALLOWED_IPS = ()
+
+# Журнал медленных запросов к базе (api.slow_queries): порог в секундах
+# (None — выключен), размер буфера в памяти, файл для строк JSON
+# (None — не писать) и снимать ли план запроса через EXPLAIN.
+SLOW_QUERY_SECONDS = 0.1
+SLOW_QUERY_LOG_SIZE = 200
+SLOW_QUERY_LOG_FILE = None
+SLOW_QUERY_EXPLAIN = True
+
+# Поиск N+1 запросов (api.nplusone): None — выключен, 'warn' — писать
+# предупреждения, 'strict' — выбрасывать исключение. Порог — сколько
+# одинаковых с точностью до параметров SELECT за запрос считать N+1.
+NPLUSONE_MODE = None
+NPLUSONE_THRESHOLD = 3
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'send_mails')
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from import_export.admin import ImportExportMixin
-from .models import User, Review, Category, Genre, Title, Comment
+from .models import (
+    User, Review, Category, Genre, Title, Comment, ImportJob
+)
 from .import_export import (
     UserResource, CategoryResource, GenreResource,
     TitleResource, ReviewResource, CommentResource,
@@ -58,3 +60,18 @@ class CommentAdmin(ImportExportMixin, admin.ModelAdmin):
     """Админка для модели Comment, с возможностью экспорта/импорта."""
 
     resource_class = CommentResource
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    """Админка для задач фонового импорта."""
+
+    list_display = (
+        'pk', 'status', 'rows_processed', 'rows_invalid', 'created',
+        'finished',
+    )
+    list_filter = ('status',)
+    readonly_fields = (
+        'chunks_done', 'rows_processed', 'rows_invalid', 'stats',
+        'elapsed', 'error', 'heartbeat', 'finished',
+    )
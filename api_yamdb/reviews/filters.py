@@ -1,5 +1,7 @@
+from django.db.models import Count
 from django_filters import rest_framework as filters
-from .models import Title
+from .models import Comment, Review, Title, User
+from .search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
@@ -12,7 +14,76 @@ class TitleFilter(filters.FilterSet):
     )
     name = filters.CharFilter(field_name='name', lookup_expr='contains')
     year = filters.NumberFilter(field_name='year', lookup_expr='exact')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year')
+        fields = ('name', 'category', 'genre', 'year', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def facets(self):
+        """Количество подходящих под фильтр произведений по значениям.
+
+        Считается тремя запросами с группировкой: по жанрам, категориям
+        и годам.
+        """
+        titles = self.qs.order_by()
+        genres = Title.genre.through.objects.filter(
+            title__in=titles.values('pk')
+        ).values_list('genre__slug').annotate(count=Count('title'))
+        categories = titles.filter(category__isnull=False).values_list(
+            'category__slug'
+        ).annotate(count=Count('pk', distinct=True))
+        years = titles.values_list('year').annotate(
+            count=Count('pk', distinct=True)
+        )
+        return {
+            'genre': dict(genres.order_by('genre__slug')),
+            'category': dict(categories.order_by('category__slug')),
+            'year': dict(years.order_by('year')),
+        }
+
+
+class UserFilter(filters.FilterSet):
+    """Фильтр модели User: поиск по началу имени без учёта регистра."""
+
+    search = filters.CharFilter(method='filter_username_prefix')
+
+    class Meta:
+        model = User
+        fields = ('search',)
+
+    def filter_username_prefix(self, queryset, name, value):
+        # Диапазон вместо istartswith, чтобы работал индекс username_key.
+        prefix = value.casefold()
+        return queryset.filter(
+            username_key__gte=prefix,
+            username_key__lt=prefix + chr(0x10FFFF),
+        )
+
+
+class ReviewExportFilter(filters.FilterSet):
+    """Фильтр выгрузки отзывов: по произведению и датам публикации."""
+
+    title = filters.NumberFilter(field_name='title_id')
+    author = filters.CharFilter(field_name='author__username')
+    pub_date = filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Review
+        fields = ('title', 'author', 'pub_date')
+
+
+class CommentExportFilter(filters.FilterSet):
+    """Фильтр выгрузки комментариев: по произведению, отзыву и датам."""
+
+    title = filters.NumberFilter(field_name='review__title_id')
+    review = filters.NumberFilter(field_name='review_id')
+    author = filters.CharFilter(field_name='author__username')
+    pub_date = filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Comment
+        fields = ('title', 'review', 'author', 'pub_date')
@@ -1,44 +1,302 @@
-from import_export import resources
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, QuerySet
+from django.utils import timezone
+from import_export import resources, widgets
+from import_export.instance_loaders import CachedInstanceLoader
 from reviews.models import User, Review, Category, Genre, Title, Comment
 
+from .search import index_titles
+from .signals import VERSIONED_MODELS
+from .versions import bump
+
+
+class CachedForeignKeyWidget(widgets.ForeignKeyWidget):
+    """Виджет внешнего ключа, берущий объекты из заранее загруженного кэша.
+
+    Кэш заполняет BulkModelResource перед импортом одним запросом на
+    все значения колонки.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = None
+
+    def preload(self, values):
+        values = {value for value in values if value not in (None, '')}
+        self.cache = {
+            str(key): obj
+            for key, obj in self.model.objects.in_bulk(
+                values, field_name=self.field
+            ).items()
+        }
+
+    def clean(self, value, row=None, **kwargs):
+        if self.cache is None or not value:
+            return super().clean(value, row, **kwargs)
+        try:
+            return self.cache[str(value)]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                f'{self.model.__name__} с {self.field}={value} не существует.'
+            )
+
+
+class BulkModelResource(resources.ModelResource):
+    """Ресурс пакетного импорта.
+
+    Существующие объекты всего файла загружаются одним запросом вместе
+    со связанными, объекты внешних ключей — одним запросом на колонку,
+    поэтому разница для предпросмотра считается без запросов на строку.
+    Экспорт так же загружает связи пачкой на каждую часть объектов.
+    Сохранение идёт через bulk_create/bulk_update пачками; сигналы при
+    этом не вызываются, и after_bulk_save делает их работу для всей
+    пачки сразу.
+    """
+
+    class Meta:
+        use_bulk = True
+        batch_size = 1000
+        instance_loader_class = CachedInstanceLoader
+        chunk_size = 2000
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.saved_instances = []
+
+    @classmethod
+    def get_fk_widget(cls, field):
+        return lambda **kwargs: CachedForeignKeyWidget(
+            model=field.related_model, **kwargs
+        )
+
+    def get_queryset(self):
+        return self.with_related(super().get_queryset())
+
+    def relation_fields(self):
+        """Выводимые ресурсом внешние ключи и связи многие-ко-многим."""
+        model = self._meta.model
+        related, many = [], []
+        for field in self.get_fields():
+            if not field.attribute or '__' in field.attribute:
+                continue
+            try:
+                model_field = model._meta.get_field(field.attribute)
+            except FieldDoesNotExist:
+                continue
+            if model_field.many_to_many:
+                many.append(model_field)
+            elif model_field.is_relation and model_field.concrete:
+                related.append(model_field)
+        return related, many
+
+    def with_related(self, queryset):
+        """Добавляет к queryset загрузку связей, выводимых ресурсом."""
+        related, many = self.relation_fields()
+        return queryset.select_related(
+            *(field.name for field in related)
+        ).prefetch_related(*(field.name for field in many))
+
+    def after_import_instance(self, instance, new, row_number=None,
+                              **kwargs):
+        # Исходный объект для разницы снимается через deepcopy, который
+        # сбрасывает кэш QuerySet, поэтому загруженные связи хранятся
+        # списком. У нового объекта связей ещё нет.
+        many = self.relation_fields()[1]
+        cache = instance.__dict__.setdefault('_prefetched_objects_cache', {})
+        for field in many:
+            if new:
+                cache[field.name] = []
+            elif field.name in cache:
+                cache[field.name] = list(cache[field.name])
+
+    def iter_queryset(self, queryset):
+        """Перебирает объекты для экспорта частями по первичному ключу.
+
+        Связи каждой части загружаются одним запросом на связь, а
+        выборка по ключу, в отличие от постраничной, не замедляется к
+        концу таблицы.
+        """
+        if not isinstance(queryset, QuerySet):
+            yield from queryset
+            return
+        queryset = self.with_related(queryset).order_by('pk')
+        size = self.get_chunk_size()
+        last_pk = None
+        while True:
+            page = queryset if last_pk is None else queryset.filter(
+                pk__gt=last_pk
+            )
+            chunk = list(page[:size])
+            yield from chunk
+            if len(chunk) < size:
+                return
+            last_pk = chunk[-1].pk
+
+    def before_import(self, dataset, using_transactions, dry_run, **kwargs):
+        super().before_import(dataset, using_transactions, dry_run, **kwargs)
+        self.saved_instances = []
+        for field in self.get_import_fields():
+            if (isinstance(field.widget, CachedForeignKeyWidget)
+                    and field.column_name in dataset.headers):
+                field.widget.preload(dataset[field.column_name])
+
+    def bulk_create(self, using_transactions, dry_run, raise_errors,
+                    batch_size=None, result=None):
+        self.saved_instances.extend(self.create_instances)
+        super().bulk_create(
+            using_transactions, dry_run, raise_errors, batch_size, result
+        )
+
+    def get_bulk_update_fields(self):
+        """Поля модели для bulk_update.
+
+        Поля ресурса переводятся в атрибуты модели; поля только для
+        чтения, первичный ключ и связи многие-ко-многим пропускаются:
+        bulk_update принимает лишь хранимые в таблице поля.
+        """
+        concrete = {
+            field.name for field in self._meta.model._meta.concrete_fields
+            if not field.primary_key
+        }
+        fields = {
+            field.attribute for name, field in self.fields.items()
+            if not field.readonly
+            and name not in self._meta.import_id_fields
+            and field.attribute in concrete
+        }
+        if self.has_modified_field():
+            fields.add('modified')
+        return sorted(fields)
+
+    def has_modified_field(self):
+        return any(
+            field.name == 'modified' for field in self._meta.model._meta.fields
+        )
+
+    def bulk_update(self, using_transactions, dry_run, raise_errors,
+                    batch_size=None, result=None):
+        # bulk_update не заполняет поля auto_now.
+        if self.has_modified_field():
+            now = timezone.now()
+            for instance in self.update_instances:
+                instance.modified = now
+        self.saved_instances.extend(self.update_instances)
+        super().bulk_update(
+            using_transactions, dry_run, raise_errors, batch_size, result
+        )
+
+    def after_import(self, dataset, result, using_transactions, dry_run,
+                     **kwargs):
+        super().after_import(
+            dataset, result, using_transactions, dry_run, **kwargs
+        )
+        if self.saved_instances and (using_transactions or not dry_run):
+            self.after_bulk_save(self.saved_instances)
+        self.saved_instances = []
+
+    def after_bulk_save(self, instances):
+        """Обслуживает сохранённые пачками объекты вместо сигналов."""
+        name = VERSIONED_MODELS.get(self._meta.model)
+        if name:
+            bump(name)
+
+
+class UserResource(BulkModelResource):
+    """Ресурс для экспорта объектов модели User."""
 
-class UserResource(resources.ModelResource):
     class Meta:
         model = User
 
+    def before_save_instance(self, instance, using_transactions, dry_run):
+        instance.username_key = instance.username.casefold()
+
+
+class CategoryResource(BulkModelResource):
+    """Ресурс для экспорта объектов модели Category."""
 
-class CategoryResource(resources.ModelResource):
     class Meta:
         model = Category
 
 
-class GenreResource(resources.ModelResource):
+class GenreResource(BulkModelResource):
+    """Ресурс для экспорта объектов модели Genre."""
+
     class Meta:
         model = Genre
 
 
-class TitleResource(resources.ModelResource):
-    genres = resources.Field(attribute='genre__name')
+class TitleResource(BulkModelResource):
+    """Ресурс для экспорта объектов модели Title."""
+
+    genres = resources.Field(
+        attribute='genre',
+        widget=widgets.ManyToManyWidget(Genre, field='name'),
+        readonly=True,
+    )
 
     class Meta:
         model = Title
         fields = ('id', 'name', 'year', 'category', 'genres', 'description')
 
+    def get_bulk_update_fields(self):
+        return [*super().get_bulk_update_fields(), 'version']
+
+    def before_save_instance(self, instance, using_transactions, dry_run):
+        if instance._state.adding:
+            instance.version += 1
+        else:
+            instance.version = F('version') + 1
+
+    def after_bulk_save(self, instances):
+        # Без id в файле база может не вернуть ключи новых строк.
+        index_titles(Title.objects.filter(
+            name__in=[title.name for title in instances]
+        ).only('id', 'name', 'description'))
+        super().after_bulk_save(instances)
+
+
+class GenreTitleResource(BulkModelResource):
+    """Ресурс для экспорта объектов связанной модели GenreTitle."""
 
-class GenreTitleResource(resources.ModelResource):
-    genre = resources.Field(column_name='genre', attribute='genre__name')
-    title = resources.Field(column_name='title', attribute='title__name')
+    genre = resources.Field(
+        column_name='genre',
+        attribute='genre',
+        widget=CachedForeignKeyWidget(Genre, field='name'),
+    )
+    title = resources.Field(
+        column_name='title',
+        attribute='title',
+        widget=CachedForeignKeyWidget(Title, field='name'),
+    )
 
     class Meta:
-        model = Title
-        fields = ('genre', 'title')
+        model = Title.genre.through
+        fields = ('id', 'genre', 'title')
+
+    def after_bulk_save(self, instances):
+        Title.objects.filter(
+            pk__in={link.title_id for link in instances}
+        ).touch()
+        bump('title')
+
 
+class ReviewResource(BulkModelResource):
+    """Ресурс для экспорта объектов модели Review."""
 
-class ReviewResource(resources.ModelResource):
     class Meta:
         model = Review
 
+    def after_bulk_save(self, instances):
+        title_ids = set()
+        for review in instances:
+            title_ids.add(review.title_id)
+            title_ids.add(getattr(review, '_rating_state', (None,))[0])
+        Title.objects.filter(pk__in=title_ids - {None}).recalculate_rating()
+        super().after_bulk_save(instances)
+
+
+class CommentResource(BulkModelResource):
+    """Ресурс для экспорта объектов модели Comment."""
 
-class CommentResource(resources.ModelResource):
     class Meta:
         model = Comment
@@ -0,0 +1,266 @@
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+
+import pandas as pd
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Category, Genre, ImportJob, Title
+from .search import index_titles
+from .versions import bump
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = (
+    'title_name', 'title_year', 'genre_slug', 'genre_name',
+    'category_slug', 'category_name',
+)
+OPTIONAL_COLUMNS = ('title_description',)
+SLUG_RE = r'^[-a-zA-Z0-9_]+$'
+# Колонки и поля моделей, длину которых ограничивает max_length.
+LENGTH_LIMITED_COLUMNS = (
+    ('title_name', Title, 'name'), ('title_description', Title, 'description'),
+    ('genre_slug', Genre, 'slug'), ('genre_name', Genre, 'name'),
+    ('category_slug', Category, 'slug'), ('category_name', Category, 'name'),
+)
+# Наборы данных, версии которых меняются при создании объектов.
+VERSIONED_STATS = (
+    ('genre', 'genres'), ('category', 'categories'),
+    ('title', 'titles'), ('title', 'links'),
+)
+
+
+class CsvImportError(Exception):
+    """Файл нельзя импортировать."""
+
+
+def read_chunks(file, chunk_size):
+    """Читает csv-файл частями по chunk_size строк."""
+    try:
+        chunks = pd.read_csv(
+            file, chunksize=chunk_size, dtype=str, keep_default_na=False,
+            encoding='utf-8',
+        )
+        for chunk in chunks:
+            missing = set(REQUIRED_COLUMNS) - set(chunk.columns)
+            if missing:
+                raise CsvImportError(
+                    f'В файле нет колонок: {", ".join(sorted(missing))}.'
+                )
+            yield chunk
+    except (
+        pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError
+    ) as error:
+        raise CsvImportError(f'Не удалось прочитать файл: {error}')
+
+
+def clean_chunk(chunk):
+    """Отбрасывает некорректные строки части файла.
+
+    Возвращает корректные строки и количество отброшенных.
+    """
+    chunk = chunk.reindex(
+        columns=[*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS], fill_value=''
+    ).apply(lambda column: column.str.strip())
+    year = pd.to_numeric(chunk['title_year'], errors='coerce')
+    valid = (
+        (chunk[list(REQUIRED_COLUMNS)] != '').all(axis=1)
+        & year.between(0, timezone.now().year)
+        & (year % 1 == 0)
+        & chunk['genre_slug'].str.match(SLUG_RE)
+        & chunk['category_slug'].str.match(SLUG_RE)
+    )
+    for column, model, name in LENGTH_LIMITED_COLUMNS:
+        limit = model._meta.get_field(name).max_length
+        valid &= chunk[column].str.len() <= limit
+    chunk = chunk[valid].assign(title_year=year[valid].astype(int))
+    return chunk, int((~valid).sum())
+
+
+def get_or_create_slugged(model, rows):
+    """Находит объекты по slug и создаёт недостающие одной вставкой.
+
+    rows — DataFrame с колонками slug и name. Возвращает
+    {slug: id} и количество созданных объектов.
+    """
+    rows = rows.drop_duplicates('slug')
+    slugs = list(rows['slug'])
+    ids = dict(
+        model.objects.filter(slug__in=slugs).values_list('slug', 'id')
+    )
+    missing = rows[~rows['slug'].isin(list(ids))]
+    if missing.empty:
+        return ids, 0
+    model.objects.bulk_create(
+        (model(slug=slug, name=name)
+         for slug, name in zip(missing['slug'], missing['name'])),
+        ignore_conflicts=True,
+    )
+    created = dict(
+        model.objects.filter(
+            slug__in=list(missing['slug'])
+        ).values_list('slug', 'id')
+    )
+    ids.update(created)
+    return ids, len(created)
+
+
+def import_titles_chunk(chunk):
+    """Импортирует часть файла с произведениями, жанрами и категориями.
+
+    На каждую сущность приходится один запрос поиска существующих
+    строк и одна пакетная вставка недостающих.
+    """
+    chunk, invalid = clean_chunk(chunk)
+    stats = Counter(rows=len(chunk) + invalid, invalid=invalid)
+    if chunk.empty:
+        return stats
+    with transaction.atomic():
+        genres, stats['genres'] = get_or_create_slugged(
+            Genre, chunk[['genre_slug', 'genre_name']].set_axis(
+                ['slug', 'name'], axis=1
+            )
+        )
+        categories, stats['categories'] = get_or_create_slugged(
+            Category, chunk[['category_slug', 'category_name']].set_axis(
+                ['slug', 'name'], axis=1
+            )
+        )
+        linked = chunk.assign(
+            genre_id=chunk['genre_slug'].map(genres),
+            category_id=chunk['category_slug'].map(categories),
+        ).dropna(subset=['genre_id', 'category_id'])
+        # Жанр или категория не созданы из-за занятого названия.
+        stats['invalid'] += len(chunk) - len(linked)
+        chunk = linked
+        titles, stats['titles'] = create_titles(
+            chunk.drop_duplicates('title_name')
+        )
+        stats['links'] = link_genres(chunk.assign(
+            title_id=chunk['title_name'].map(titles)
+        ).dropna(subset=['title_id']))
+        bump(*{name for name, key in VERSIONED_STATS if stats[key]})
+    return stats
+
+
+def create_titles(rows):
+    """Создаёт недостающие произведения, возвращает {название: id}."""
+    names = list(rows['title_name'])
+    ids = dict(Title.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = rows[~rows['title_name'].isin(list(ids))]
+    if missing.empty:
+        return ids, 0
+    Title.objects.bulk_create(
+        (
+            Title(
+                name=name, year=year, category_id=int(category_id),
+                description=description, version=1,
+            )
+            for name, year, category_id, description in zip(
+                missing['title_name'], missing['title_year'].tolist(),
+                missing['category_id'], missing['title_description'],
+            )
+        ),
+        ignore_conflicts=True,
+    )
+    created = list(Title.objects.filter(
+        name__in=list(missing['title_name'])
+    ).only('id', 'name', 'description'))
+    index_titles(created)
+    ids.update((title.name, title.id) for title in created)
+    return ids, len(created)
+
+
+def link_genres(rows):
+    """Связывает произведения с жанрами, возвращает число новых связей."""
+    GenreTitle = Title.genre.through
+    pairs = set(zip(
+        rows['title_id'].astype(int).tolist(),
+        rows['genre_id'].astype(int).tolist(),
+    ))
+    existing = set(GenreTitle.objects.filter(
+        title_id__in={title_id for title_id, _ in pairs}
+    ).values_list('title_id', 'genre_id'))
+    new = pairs - existing
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_id in new
+    )
+    Title.objects.filter(
+        pk__in={title_id for title_id, _ in new}
+    ).touch()
+    return len(new)
+
+
+def claim_import_job(stale_after):
+    """Берёт в работу следующую задачу импорта.
+
+    Кроме новых задач берутся и выполняющиеся, у которых обработчик
+    не отмечался дольше stale_after секунд: он упал или был остановлен.
+    Возвращает задачу или None.
+    """
+    now = timezone.now()
+    candidates = ImportJob.objects.filter(
+        Q(status=ImportJob.Status.PENDING)
+        | Q(status=ImportJob.Status.RUNNING,
+            heartbeat__lt=now - timedelta(seconds=stale_after))
+    ).order_by('created', 'pk').values_list('pk', 'status', 'heartbeat')
+    for pk, status, heartbeat in candidates[:10]:
+        # Условное обновление: задачу получает только один обработчик.
+        claimed = ImportJob.objects.filter(
+            pk=pk, status=status, heartbeat=heartbeat
+        ).update(status=ImportJob.Status.RUNNING, heartbeat=now)
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def run_import_job(job):
+    """Выполняет задачу импорта с первой необработанной части файла.
+
+    Каждая часть сохраняется вместе с отметкой о ней в задаче в одной
+    транзакции, поэтому после сбоя обработка продолжается с части,
+    следующей за последней сохранённой. Непредвиденная ошибка тоже
+    завершает задачу, иначе после IMPORT_JOB_STALE_SECONDS её снова
+    возьмёт обработчик и упадёт на той же части.
+    """
+    try:
+        with job.file.open('rb') as file:
+            for number, chunk in enumerate(
+                read_chunks(file, job.chunk_size)
+            ):
+                if number < job.chunks_done:
+                    continue
+                started = time.perf_counter()
+                with transaction.atomic():
+                    stats = import_titles_chunk(chunk)
+                    job.chunks_done = number + 1
+                    job.rows_processed += stats.pop('rows')
+                    job.rows_invalid += stats.pop('invalid')
+                    job.stats = dict(Counter(job.stats) + stats)
+                    job.elapsed += time.perf_counter() - started
+                    job.heartbeat = timezone.now()
+                    job.save(update_fields=(
+                        'chunks_done', 'rows_processed', 'rows_invalid',
+                        'stats', 'elapsed', 'heartbeat',
+                    ))
+    except (CsvImportError, OSError) as error:
+        finish_import_job(job, ImportJob.Status.FAILED, str(error))
+        return
+    except Exception as error:
+        logger.exception('Задача импорта %s завершилась ошибкой', job.pk)
+        finish_import_job(
+            job, ImportJob.Status.FAILED, f'{type(error).__name__}: {error}'
+        )
+        return
+    finish_import_job(job, ImportJob.Status.DONE)
+
+
+def finish_import_job(job, status, error=''):
+    job.status = status
+    job.error = error
+    job.finished = timezone.now()
+    job.save(update_fields=('status', 'error', 'finished'))
@@ -0,0 +1,235 @@
+import csv
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import index_titles
+from reviews.versions import bump
+
+GenreTitle = Title.genre.through
+
+# Файлы в порядке зависимостей: (файл, модель, метод сборки, набор данных).
+SOURCES = (
+    ('users.csv', User, 'build_user', 'user'),
+    ('category.csv', Category, 'build_category', 'category'),
+    ('genre.csv', Genre, 'build_genre', 'genre'),
+    ('titles.csv', Title, 'build_title', 'title'),
+    ('genre_title.csv', GenreTitle, 'build_genre_title', 'title'),
+    ('review.csv', Review, 'build_review', 'review'),
+    ('comments.csv', Comment, 'build_comment', 'comment'),
+)
+
+
+@contextmanager
+def keep_pub_date(*models):
+    """Сохраняет даты публикации из файла вместо auto_now_add."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def unique_keys(model):
+    """Наборы полей модели, значения которых не должны повторяться."""
+    meta = model._meta
+    keys = [
+        (field.attname,) for field in meta.local_fields
+        if field.unique and not field.primary_key
+    ]
+    keys += [
+        tuple(meta.get_field(name).attname for name in fields)
+        for fields in (
+            *meta.unique_together,
+            *(constraint.fields
+              for constraint in meta.total_unique_constraints),
+        )
+    ]
+    return keys
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        yield from csv.DictReader(file)
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из csv-файлов static/data пакетными вставками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.BASE_DIR / 'static' / 'data',
+            type=Path,
+            help='Каталог с csv-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной вставке.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.is_dir():
+            raise CommandError(f'Каталог {path} не найден.')
+        self.batch_size = options['batch_size']
+        # Карты идентификаторов из файлов в ключи базы.
+        self.ids = {model: {} for _, model, _, _ in SOURCES}
+        changed = set()
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(), keep_pub_date(Review, Comment):
+                for filename, model, build, name in SOURCES:
+                    if not (path / filename).exists():
+                        continue
+                    build = getattr(self, build)
+                    if self.load(path / filename, model, build):
+                        changed.add(name)
+                self.finish(changed)
+        except (DatabaseError, KeyError, ValueError) as error:
+            raise CommandError(f'Загрузка отменена: {error!r}')
+        total = sum(len(ids) for ids in self.ids.values())
+        self.report('Всего', total, time.perf_counter() - started)
+
+    def load(self, path, model, build):
+        ids = self.ids[model]
+        seen = {key: set() for key in unique_keys(model)}
+        started = time.perf_counter()
+        loaded = skipped = 0
+        for rows in batches(read_csv(path), self.batch_size):
+            objs = [
+                obj for obj in map(build, rows)
+                if obj is not None and self.is_new(obj, seen)
+            ]
+            skipped += len(rows) - len(objs)
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+            ids.update((obj.csv_id, obj.pk) for obj in objs)
+            if model is Title:
+                index_titles(objs)
+            loaded += len(objs)
+        self.report(path.name, loaded, time.perf_counter() - started)
+        if skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{path.name}: пропущено строк без связей '
+                    f'или с повторами: {skipped}'
+                )
+            )
+        return loaded
+
+    def finish(self, changed):
+        """Обслуживает то, что при bulk_create делают сигналы."""
+        models = [model for _, model, _, _ in SOURCES if self.ids[model]]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        if self.ids[Review]:
+            Title.objects.all().recalculate_rating()
+        bump(*sorted(changed))
+
+    @staticmethod
+    def is_new(obj, seen):
+        """Отмечает уникальные значения объекта, False для повтора."""
+        values = {
+            key: tuple(getattr(obj, name) for name in key) for key in seen
+        }
+        if any(value in seen[key] for key, value in values.items()):
+            return False
+        for key, value in values.items():
+            seen[key].add(value)
+        return True
+
+    def report(self, label, rows, seconds):
+        rate = rows / seconds if seconds else 0
+        self.stdout.write(
+            f'{label}: {rows} строк за {seconds:.2f} с ({rate:.0f} строк/с)'
+        )
+
+    def resolve(self, model, value):
+        return self.ids[model].get(int(value)) if value else None
+
+    def build_user(self, row):
+        username = row['username']
+        return self.with_id(User(
+            username=username, username_key=username.casefold(),
+            email=row['email'], role=row['role'] or User.RoleChoice.USER,
+            bio=row['bio'], first_name=row['first_name'],
+            last_name=row['last_name'], password=make_password(None),
+        ), row)
+
+    def build_category(self, row):
+        return self.with_id(
+            Category(name=row['name'], slug=row['slug']), row
+        )
+
+    def build_genre(self, row):
+        return self.with_id(
+            Genre(name=row['name'], slug=row['slug']), row
+        )
+
+    def build_title(self, row):
+        return self.with_id(Title(
+            name=row['name'], year=row['year'],
+            category_id=self.resolve(Category, row['category']),
+            description=row.get('description', ''), version=1,
+        ), row)
+
+    def build_genre_title(self, row):
+        title_id = self.resolve(Title, row['title_id'])
+        genre_id = self.resolve(Genre, row['genre_id'])
+        if title_id is None or genre_id is None:
+            return None
+        return self.with_id(
+            GenreTitle(title_id=title_id, genre_id=genre_id),
+            row
+        )
+
+    def build_review(self, row):
+        title_id = self.resolve(Title, row['title_id'])
+        author_id = self.resolve(User, row['author'])
+        if title_id is None or author_id is None:
+            return None
+        return self.with_id(Review(
+            title_id=title_id, author_id=author_id,
+            text=row['text'], score=int(row['score']),
+            pub_date=parse_datetime(row['pub_date']),
+        ), row)
+
+    def build_comment(self, row):
+        review_id = self.resolve(Review, row['review_id'])
+        author_id = self.resolve(User, row['author'])
+        if review_id is None or author_id is None:
+            return None
+        return self.with_id(Comment(
+            review_id=review_id, author_id=author_id,
+            text=row['text'], pub_date=parse_datetime(row['pub_date']),
+        ), row)
+
+    @staticmethod
+    def with_id(obj, row):
+        obj.csv_id = int(row['id'])
+        obj.pk = obj.csv_id
+        return obj
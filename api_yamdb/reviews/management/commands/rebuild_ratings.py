@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики рейтинга произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сверить счётчики и вывести расхождения.',
+        )
+
+    def handle(self, *args, **options):
+        mismatched = Title.objects.annotate(
+            actual_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_count=Count('reviews'),
+        ).filter(
+            ~Q(rating_sum=F('actual_sum')) | ~Q(rating_count=F('actual_count'))
+        )
+        if options['check']:
+            for title in mismatched:
+                self.stdout.write(
+                    f'{title.pk} {title.name}: '
+                    f'{title.rating_sum}/{title.rating_count}, '
+                    f'ожидалось {title.actual_sum}/{title.actual_count}'
+                )
+            self.stdout.write(f'Расхождений: {mismatched.count()}')
+            return
+        with transaction.atomic():
+            updated = Title.objects.recalculate_rating()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитан рейтинг произведений: {updated}')
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title, TitleToken
+from reviews.search import index_titles
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений в одной пачке.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        titles = Title.objects.only('id', 'name', 'description').order_by('id')
+        total = 0
+        with transaction.atomic():
+            TitleToken.objects.all().delete()
+            last_id = 0
+            while True:
+                batch = list(titles.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                index_titles(batch)
+                total += len(batch)
+                last_id = batch[-1].id
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано произведений: {total}')
+        )
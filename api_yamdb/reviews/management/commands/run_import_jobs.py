@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.imports import claim_import_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи импорта csv-файлов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить ожидающие задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди, с.',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=settings.IMPORT_JOB_STALE_SECONDS,
+            help='Через сколько секунд без отметок задача считается '
+                 'брошенной.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_import_job(options['stale_after'])
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            self.stdout.write(
+                f'Задача {job.pk}: начата с части {job.chunks_done + 1}'
+            )
+            run_import_job(job)
+            rate = job.rows_per_second or 0
+            self.stdout.write(
+                f'Задача {job.pk}: {job.status}, строк {job.rows_processed}'
+                f' ({rate:.0f} строк/с) {job.error}'.rstrip()
+            )
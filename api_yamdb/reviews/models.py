@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from .validators import validate_year
 
@@ -28,6 +31,12 @@ class User(AbstractUser):
             )
         ]
     )
+    username_key = models.CharField(
+        max_length=150,
+        db_index=True,
+        editable=False,
+        verbose_name='Ключ поиска по имени'
+    )
     email = models.EmailField(
         max_length=254,
         unique=True,
@@ -71,6 +80,10 @@ class User(AbstractUser):
     def __str__(self) -> str:
         return self.username
 
+    def save(self, *args, **kwargs):
+        self.username_key = self.username.casefold()
+        super().save(*args, **kwargs)
+
     @property
     def is_admin(self):
         return (
@@ -131,6 +144,43 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с обслуживанием счётчиков рейтинга."""
+
+    def add_score(self, score, count=1):
+        """Атомарно добавляет оценки к счётчикам рейтинга."""
+        return self.update(
+            rating_sum=models.F('rating_sum') + score,
+            rating_count=models.F('rating_count') + count,
+            version=models.F('version') + 1,
+            modified=timezone.now(),
+        )
+
+    def touch(self):
+        """Увеличивает версию произведений без их сохранения."""
+        return self.update(
+            version=models.F('version') + 1, modified=timezone.now()
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает счётчики рейтинга по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+            version=models.F('version') + 1,
+            modified=timezone.now(),
+        )
+
+
 class Title(models.Model):
     """Модель произведений."""
 
@@ -155,14 +205,70 @@ class Title(models.Model):
         blank=True,
     )
     genre = models.ManyToManyField(Genre)
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    COUNTER_FIELDS = ('rating_sum', 'rating_count')
 
     class Meta:
         ordering = ('name', 'year')
         verbose_name = 'Произведение'
+        indexes = [models.Index(fields=('modified', 'id'))]
 
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Сохраняет произведение, не затирая счётчики рейтинга.
+
+        Счётчики меняются только атомарными update, поэтому при
+        изменении существующего произведения они не сохраняются, а
+        версия увеличивается выражением F и подгружается при обращении.
+        """
+        if self._state.adding or kwargs.get('force_insert'):
+            self.version += 1
+            return super().save(*args, **kwargs)
+        update_fields = kwargs.pop('update_fields', None)
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        self.version = models.F('version') + 1
+        super().save(
+            *args, update_fields={*update_fields, 'version'}, **kwargs
+        )
+        del self.__dict__['version']
+
+    @property
+    def rating(self):
+        """Средняя оценка произведения или None, если отзывов нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class Review(models.Model):
     """Модель отзывов."""
@@ -196,11 +302,16 @@ class Review(models.Model):
         verbose_name='Оценка',
         choices=SCORE_CHOICE
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [models.Index(fields=('modified', 'id'))]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -234,11 +345,218 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments'
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [models.Index(fields=('modified', 'id'))]
 
     def __str__(self) -> str:
         return self.text
+
+
+class TitleToken(models.Model):
+    """Токен поискового индекса произведений."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name='Произведение'
+    )
+    token = models.CharField(
+        max_length=200,
+        verbose_name='Токен'
+    )
+    weight = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Вес'
+    )
+
+    class Meta:
+        verbose_name = 'Токен поиска'
+        verbose_name_plural = 'Токены поиска'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['token', 'title'],
+                name='unique_token_title'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return self.token
+
+
+class TitleTrigram(models.Model):
+    """Триграмма названия произведения для нечёткого поиска."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='trigrams',
+        verbose_name='Произведение'
+    )
+    trigram = models.CharField(
+        max_length=3,
+        verbose_name='Триграмма'
+    )
+
+    class Meta:
+        verbose_name = 'Триграмма'
+        verbose_name_plural = 'Триграммы'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['trigram', 'title'],
+                name='unique_trigram_title'
+            )
+        ]
+
+    def __str__(self) -> str:
+        return self.trigram
+
+
+class ContentVersion(models.Model):
+    """Счётчик изменений набора данных для условных GET-запросов."""
+
+    name = models.CharField(
+        max_length=50,
+        primary_key=True,
+        verbose_name='Набор данных'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self) -> str:
+        return f'{self.name}: {self.version}'
+
+
+class Tombstone(models.Model):
+    """Отметка об удалении объекта для инкрементальной синхронизации."""
+
+    collection = models.CharField(
+        max_length=50,
+        verbose_name='Набор данных'
+    )
+    object_id = models.PositiveBigIntegerField(
+        verbose_name='Идентификатор объекта'
+    )
+    deleted = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Дата удаления'
+    )
+
+    class Meta:
+        verbose_name = 'Удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
+        indexes = [
+            models.Index(fields=('collection', 'deleted', 'object_id'))
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.collection}: {self.object_id}'
+
+
+class ImportJob(models.Model):
+    """Фоновый импорт csv-файла с произведениями.
+
+    Файл обрабатывается частями; после каждой части в той же транзакции
+    сохраняется номер последней части, так что прерванная задача
+    продолжается с места остановки.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        DONE = 'done', _('Done')
+        FAILED = 'failed', _('Failed')
+
+    file = models.FileField(
+        upload_to='imports/',
+        verbose_name='Файл'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='import_jobs',
+        verbose_name='Автор'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+        verbose_name='Статус'
+    )
+    chunk_size = models.PositiveIntegerField(
+        verbose_name='Строк в части'
+    )
+    chunks_done = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Обработано частей'
+    )
+    rows_processed = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Обработано строк'
+    )
+    rows_invalid = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Некорректных строк'
+    )
+    stats = models.JSONField(
+        default=dict,
+        verbose_name='Создано объектов'
+    )
+    elapsed = models.FloatField(
+        default=0,
+        verbose_name='Время обработки, с'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    heartbeat = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последняя активность'
+    )
+    finished = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата завершения'
+    )
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Задача импорта'
+        verbose_name_plural = 'Задачи импорта'
+
+    def __str__(self) -> str:
+        return f'{self.pk}: {self.status}'
+
+    @property
+    def rows_per_second(self):
+        """Скорость обработки строк или None, если обработка не начата."""
+        if not self.elapsed:
+            return None
+        return self.rows_processed / self.elapsed
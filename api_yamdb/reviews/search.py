@@ -0,0 +1,115 @@
+import math
+import re
+from collections import Counter
+
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+from .models import TitleToken, TitleTrigram
+
+TOKEN_RE = re.compile(r'\w+')
+NAME_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+SIMILARITY_THRESHOLD = 0.3
+CANDIDATES_PER_RESULT = 5
+
+
+def normalize(text):
+    """Приводит текст к виду для поиска: регистр и ё/е не различаются."""
+    return text.casefold().replace('ё', 'е')
+
+
+def tokenize(text):
+    """Разбивает текст на нормализованные слова."""
+    return TOKEN_RE.findall(normalize(text or ''))
+
+
+def title_tokens(title):
+    """Возвращает токены произведения с весами."""
+    weights = Counter()
+    for token in tokenize(title.name):
+        weights[token] += NAME_WEIGHT
+    for token in tokenize(title.description):
+        weights[token] += DESCRIPTION_WEIGHT
+    return weights
+
+
+def trigrams(text):
+    """Возвращает множество триграмм слов текста, как в pg_trgm."""
+    result = set()
+    for word in tokenize(text):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def index_titles(titles):
+    """Перестраивает поисковые индексы для переданных произведений."""
+    titles = list(titles)
+    TitleToken.objects.filter(title__in=titles).delete()
+    TitleToken.objects.bulk_create(
+        TitleToken(title=title, token=token, weight=weight)
+        for title in titles
+        for token, weight in title_tokens(title).items()
+    )
+    TitleTrigram.objects.filter(title__in=titles).delete()
+    TitleTrigram.objects.bulk_create(
+        TitleTrigram(title=title, trigram=trigram)
+        for title in titles
+        for trigram in trigrams(title.name)
+    )
+
+
+def search_titles(queryset, query):
+    """Оставляет произведения, содержащие все слова запроса.
+
+    Результат упорядочен по убыванию релевантности: совпадения в
+    названии весят больше совпадений в описании.
+    """
+    tokens = set(tokenize(query))
+    if not tokens:
+        return queryset.none()
+    matches = TitleToken.objects.filter(token__in=tokens).order_by()
+    found = matches.values('title').annotate(
+        matched=Count('token')
+    ).filter(matched=len(tokens)).values('title')
+    rank = matches.filter(title=OuterRef('pk')).values('title').annotate(
+        rank=Sum('weight')
+    ).values('rank')
+    return queryset.filter(pk__in=found).annotate(
+        search_rank=Subquery(rank)
+    ).order_by('-search_rank', 'id')
+
+
+def similar_titles(query, limit):
+    """Возвращает {id произведения: сходство} для limit самых похожих.
+
+    Сходство считается по Жаккару на множествах триграмм названия.
+    Кандидаты берутся из индекса триграмм, таблица произведений не
+    просматривается целиком.
+    """
+    query_trigrams = trigrams(query)
+    if not query_trigrams:
+        return {}
+    min_shared = math.ceil(len(query_trigrams) * SIMILARITY_THRESHOLD)
+    candidates = dict(
+        TitleTrigram.objects.filter(
+            trigram__in=query_trigrams
+        ).order_by().values('title').annotate(
+            shared=Count('trigram')
+        ).filter(shared__gte=min_shared).order_by(
+            '-shared'
+        ).values_list('title', 'shared')[:limit * CANDIDATES_PER_RESULT]
+    )
+    sizes = TitleTrigram.objects.filter(
+        title__in=candidates
+    ).order_by().values('title').annotate(
+        total=Count('trigram')
+    ).values_list('title', 'total')
+    scores = {}
+    for title_id, total in sizes:
+        shared = candidates[title_id]
+        similarity = shared / (len(query_trigrams) + total - shared)
+        if similarity >= SIMILARITY_THRESHOLD:
+            scores[title_id] = similarity
+    best = sorted(scores, key=lambda title_id: (-scores[title_id], title_id))
+    return {title_id: scores[title_id] for title_id in best[:limit]}
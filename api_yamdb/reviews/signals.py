@@ -0,0 +1,146 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title, Tombstone, User
+from .search import index_titles
+from .versions import bump
+
+VERSIONED_MODELS = {
+    Category: 'category',
+    Genre: 'genre',
+    Title: 'title',
+    Review: 'review',
+    Comment: 'comment',
+    User: 'user',
+}
+# Наборы данных инкрементальной синхронизации, для которых хранятся
+# отметки об удалении.
+SYNCED_MODELS = {
+    Title: 'titles',
+    Review: 'reviews',
+    Comment: 'comments',
+}
+# Поля связанных моделей в строках синхронизации (api.exports): при их
+# изменении строки синхронизации отправляются заново.
+SYNCED_RELATED_KEYS = {
+    Category: ('slug', ((Title, 'category'),)),
+    User: ('username', ((Review, 'author'), (Comment, 'author'))),
+}
+
+
+def _remember_score(instance):
+    """Запоминает сохранённые в базе произведение и оценку отзыва."""
+    instance._rating_state = (
+        instance.__dict__.get('title_id'),
+        instance.__dict__.get('score'),
+    )
+
+
+@receiver(post_init, sender=Review)
+def review_loaded(sender, instance, **kwargs):
+    _remember_score(instance)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    old_title_id, old_score = instance._rating_state
+    with transaction.atomic():
+        if created:
+            Title.objects.filter(pk=instance.title_id).add_score(
+                instance.score
+            )
+        elif old_score is None:
+            Title.objects.filter(
+                pk__in=(old_title_id, instance.title_id)
+            ).recalculate_rating()
+        elif (old_title_id, old_score) != (instance.title_id, instance.score):
+            Title.objects.filter(pk=old_title_id).add_score(-old_score, -1)
+            Title.objects.filter(pk=instance.title_id).add_score(
+                instance.score
+            )
+    _remember_score(instance)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из рейтинга произведения."""
+    title_id, score = instance._rating_state
+    if score is None:
+        title_id, score = instance.title_id, instance.score
+    Title.objects.filter(pk=title_id).add_score(-score, -1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, **kwargs):
+    """Обновляет поисковый индекс сохранённого произведения."""
+    index_titles([instance])
+
+
+def content_changed(sender, **kwargs):
+    """Меняет версию набора данных при записи в него."""
+    bump(VERSIONED_MODELS[sender])
+
+
+# Приёмники подключаются только к нужным моделям: приёмник post_delete
+# без sender лишил бы остальные модели удаления одним DELETE.
+for model in VERSIONED_MODELS:
+    post_save.connect(content_changed, sender=model)
+    post_delete.connect(content_changed, sender=model)
+
+
+def object_deleted(sender, instance, **kwargs):
+    """Оставляет отметку об удалении для инкрементальной синхронизации."""
+    Tombstone.objects.create(
+        collection=SYNCED_MODELS[sender], object_id=instance.pk
+    )
+
+
+for model in SYNCED_MODELS:
+    post_delete.connect(object_deleted, sender=model)
+
+
+def synced_key_loaded(sender, instance, **kwargs):
+    """Запоминает поле, которое синхронизация берёт из связанной модели."""
+    field, _ = SYNCED_RELATED_KEYS[sender]
+    instance._synced_key = instance.__dict__.get(field)
+
+
+def synced_key_saved(sender, instance, created, **kwargs):
+    """Отмечает изменёнными строки синхронизации с прежним значением."""
+    field, related = SYNCED_RELATED_KEYS[sender]
+    old, new = instance._synced_key, instance.__dict__.get(field)
+    instance._synced_key = new
+    if created or old is None or old == new:
+        return
+    for model, lookup in related:
+        queryset = model.objects.filter(**{lookup: instance})
+        if model is Title:
+            queryset.touch()
+        else:
+            queryset.update(modified=timezone.now())
+
+
+for model in SYNCED_RELATED_KEYS:
+    post_init.connect(synced_key_loaded, sender=model)
+    post_save.connect(synced_key_saved, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """Меняет версии произведений при изменении их жанров."""
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        titles = Title.objects.filter(pk=instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        titles = Title.objects.filter(pk__in=pk_set)
+    elif action == 'pre_clear' and reverse:
+        titles = instance.title_set.all()
+    else:
+        return
+    titles.touch()
+    bump('title')
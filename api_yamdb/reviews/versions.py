@@ -0,0 +1,35 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ContentVersion
+
+
+def bump(*names):
+    """Увеличивает версии наборов данных."""
+    for name in names:
+        updated = ContentVersion.objects.filter(name=name).update(
+            version=F('version') + 1, modified=timezone.now()
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                ContentVersion.objects.create(name=name, version=1)
+        except IntegrityError:
+            bump(name)
+
+
+def get_versions(names):
+    """Возвращает {набор данных: (версия, дата изменения)} одним запросом.
+
+    Для наборов, которые ещё не менялись, версия 0 и дата None.
+    """
+    versions = dict.fromkeys(names, (0, None))
+    versions.update(
+        (name, (version, modified))
+        for name, version, modified in ContentVersion.objects.filter(
+            name__in=names
+        ).values_list('name', 'version', 'modified')
+    )
+    return versions
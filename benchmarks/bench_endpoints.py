@@ -0,0 +1,390 @@
+"""Задержка, пропускная способность и память для всех адресов API.
+
+Для каждого размера данных создаётся тестовая база с синтетическими
+пользователями, произведениями, отзывами и комментариями; отзывы
+распределены по закону Ципфа, поэтому несколько произведений
+«горячие». Каждый адрес api/urls.py вызывается через WSGI-приложение
+проекта без сети. Запуск из корня репозитория:
+
+    python -m benchmarks.bench_endpoints --sizes 100,1000 --requests 50 \\
+        --output results.json
+
+Пиковая память и число запросов к базе снимаются отдельным вызовом под
+tracemalloc, чтобы трассировка не искажала время. По умолчанию кэш
+ответов очищается перед каждым запросом; --warm-cache оставляет его.
+Файл --baseline с результатами прошлого запуска добавляет к выводу
+сравнение p95 и запросов в секунду.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from io import BytesIO
+from urllib.parse import quote
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.common import setup_django, test_database
+
+REVIEWS_PER_TITLE = 5
+COMMENTS_PER_TITLE = 5
+# Показатель закона Ципфа для распределения отзывов по произведениям.
+SKEW = 1.1
+
+# (название, метод, адрес, тело, пользователь). Адрес и тело-функция
+# заполняются ключами из seed() и номером запроса i.
+ENDPOINTS = [
+    ('signup', 'POST', '/api/v1/auth/signup/',
+     lambda ids, i: {'username': f'guest{i}',
+                     'email': f'guest{i}@yamdb.fake'}, None),
+    ('token', 'POST', '/api/v1/auth/token/',
+     lambda ids, i: ids['token_data'], None),
+    ('users-list', 'GET', '/api/v1/users/', None, 'admin'),
+    ('users-detail', 'GET', '/api/v1/users/user0/', None, 'admin'),
+    ('users-create', 'POST', '/api/v1/users/',
+     lambda ids, i: {'username': f'new{i}', 'email': f'new{i}@yamdb.fake'},
+     'admin'),
+    ('users-me', 'GET', '/api/v1/users/me/', None, 'user'),
+    ('categories-list', 'GET', '/api/v1/categories/', None, None),
+    ('categories-create', 'POST', '/api/v1/categories/',
+     lambda ids, i: {'name': f'Раздел {i}', 'slug': f'part-{i}'}, 'admin'),
+    ('genres-list', 'GET', '/api/v1/genres/', None, None),
+    ('genres-create', 'POST', '/api/v1/genres/',
+     lambda ids, i: {'name': f'Стиль {i}', 'slug': f'style-{i}'}, 'admin'),
+    ('titles-list', 'GET', '/api/v1/titles/', None, None),
+    ('titles-list-filtered', 'GET', '/api/v1/titles/?genre=genre-1', None,
+     None),
+    ('titles-list-cursor', 'GET', '/api/v1/titles/?pagination=cursor', None,
+     None),
+    ('titles-search', 'GET', '/api/v1/titles/?search=произведение 7', None,
+     None),
+    ('titles-detail', 'GET', '/api/v1/titles/{hot_title}/', None, None),
+    ('titles-facets', 'GET', '/api/v1/titles/facets/', None, None),
+    ('titles-fuzzy', 'GET', '/api/v1/titles/fuzzy/?query=праизведение',
+     None, None),
+    ('titles-create', 'POST', '/api/v1/titles/',
+     lambda ids, i: {'name': f'Новинка {i}', 'year': 2020,
+                     'genre': ['genre-1'], 'category': 'category-1'},
+     'admin'),
+    ('reviews-list', 'GET', '/api/v1/titles/{hot_title}/reviews/', None,
+     None),
+    ('reviews-detail', 'GET',
+     '/api/v1/titles/{hot_title}/reviews/{hot_review}/', None, None),
+    ('reviews-create', 'POST', '/api/v1/titles/{i_title}/reviews/',
+     lambda ids, i: {'text': 'Отзыв', 'score': 1 + i % 10}, 'admin'),
+    ('comments-list', 'GET',
+     '/api/v1/titles/{hot_title}/reviews/{hot_review}/comments/', None,
+     None),
+    ('comments-detail', 'GET',
+     '/api/v1/titles/{hot_title}/reviews/{hot_review}/comments/'
+     '{hot_comment}/', None, None),
+    ('comments-create', 'POST',
+     '/api/v1/titles/{hot_title}/reviews/{hot_review}/comments/',
+     lambda ids, i: {'text': f'Комментарий {i}'}, 'user'),
+    ('imports-list', 'GET', '/api/v1/imports/', None, 'admin'),
+    ('cache-stats', 'GET', '/api/v1/cache/stats/', None, 'admin'),
+    ('instrumentation', 'GET', '/api/v1/instrumentation/', None, 'admin'),
+    ('slow-queries', 'GET', '/api/v1/instrumentation/slow-queries/', None,
+     'admin'),
+    ('metrics', 'GET', '/metrics', None, None),
+    ('export-reviews', 'GET', '/api/v1/export/reviews.ndjson', None,
+     'admin'),
+    ('sync-titles', 'GET', '/api/v1/sync/titles/', None, 'admin'),
+]
+
+
+def zipf_counts(rng, items, total):
+    """Раскладывает total штук по items с весами по закону Ципфа."""
+    weights = [1 / (rank + 1) ** SKEW for rank in range(len(items))]
+    return Counter(rng.choices(items, weights, k=total))
+
+
+def seed_catalog(size):
+    from reviews.models import Category, Genre, Title, User
+    from reviews.search import index_titles
+
+    # Первичные ключи задаются явно: SQLite не возвращает их из
+    # bulk_create.
+    categories = Category.objects.bulk_create(
+        Category(id=idx, name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(1, 11)
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(id=idx, name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(1, 21)
+    )
+    users = User.objects.bulk_create(
+        User(
+            id=idx + 1, username=f'user{idx}', username_key=f'user{idx}',
+            email=f'user{idx}@yamdb.fake',
+        )
+        for idx in range(max(size, 10))
+    )
+    titles = Title.objects.bulk_create(
+        Title(
+            id=idx, name=f'Произведение {idx}', year=1900 + idx % 120,
+            category=categories[idx % len(categories)],
+            description=f'Описание произведения {idx}',
+        )
+        for idx in range(1, size + 1)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title=title, genre=genres[(idx + shift) % 20])
+        for idx, title in enumerate(titles)
+        for shift in range(1 + idx % 3)
+    )
+    index_titles(titles)
+    return users, titles
+
+
+def seed(size, rng):
+    """Создаёт данные размера size и возвращает ключи для адресов."""
+    from django.contrib.auth.tokens import default_token_generator
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import Comment, Review, Title, User
+
+    users, titles = seed_catalog(size)
+    reviews = []
+    counts = zipf_counts(rng, titles, size * REVIEWS_PER_TITLE)
+    for title, count in counts.most_common():
+        for author in rng.sample(users, min(count, len(users))):
+            reviews.append(Review(
+                id=len(reviews) + 1, title=title, author=author,
+                text='Текст отзыва ' * 10, score=rng.randint(1, 10),
+            ))
+    Review.objects.bulk_create(reviews)
+    Title.objects.recalculate_rating()
+    comments = zipf_counts(rng, reviews, size * COMMENTS_PER_TITLE)
+    Comment.objects.bulk_create(
+        Comment(review=review, author=rng.choice(users), text='Комментарий')
+        for review, count in comments.items()
+        for _ in range(count)
+    )
+    admin = User.objects.create_user(
+        username='bench-admin', email='admin@yamdb.fake', role='admin'
+    )
+    hot_review = reviews[0]
+    return {
+        'hot_title': hot_review.title_id,
+        'hot_review': hot_review.pk,
+        'hot_comment': hot_review.comments.values_list(
+            'pk', flat=True
+        ).first(),
+        'token_data': {
+            'username': users[0].username,
+            'confirmation_code': default_token_generator.make_token(
+                users[0]
+            ),
+        },
+        'tokens': {
+            'admin': str(AccessToken.for_user(admin)),
+            'user': str(AccessToken.for_user(users[0])),
+        },
+    }
+
+
+def make_environ(method, path, body, token):
+    path, _, query = path.partition('?')
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update(
+        REQUEST_METHOD=method, PATH_INFO=path, HTTP_HOST='testserver',
+        QUERY_STRING=quote(query, safe='=&'), REMOTE_ADDR='127.0.0.1',
+    )
+    if body is not None:
+        data = json.dumps(body).encode()
+        environ.update({
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(data)),
+            'wsgi.input': BytesIO(data),
+        })
+    if token:
+        environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return environ
+
+
+def call(application, environ):
+    """Вызывает WSGI-приложение и читает ответ целиком."""
+    statuses = []
+    result = application(
+        environ, lambda status, headers, exc_info=None: statuses.append(
+            status
+        )
+    )
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return int(statuses[0].split()[0])
+
+
+def prepare(endpoint, ids, i):
+    _, method, path, body, user = endpoint
+    keys = {**ids, 'i_title': 1 + i % ids['titles']}
+    if callable(body):
+        body = body(ids, i)
+    return make_environ(
+        method, path.format(**keys), body, ids['tokens'].get(user)
+    )
+
+
+def profile(application, environ):
+    """Пиковая память и число запросов к базе за один вызов."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as context:
+            call(application, environ)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, len(context.captured_queries)
+
+
+def bench_endpoint(application, endpoint, ids, requests, warmup,
+                   warm_cache):
+    from django.core.cache import cache
+
+    timings, statuses = [], Counter()
+    for i in range(warmup + requests):
+        environ = prepare(endpoint, ids, ids['counter'] + i)
+        if not warm_cache:
+            cache.clear()
+        start = time.perf_counter()
+        status = call(application, environ)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+            statuses[status] += 1
+    ids['counter'] += warmup + requests + 1
+    if not warm_cache:
+        cache.clear()
+    peak, queries = profile(
+        application, prepare(endpoint, ids, ids['counter'] - 1)
+    )
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'endpoint': endpoint[0],
+        'method': endpoint[1],
+        'path': endpoint[2],
+        'requests': requests,
+        'statuses': {str(code): count for code, count in statuses.items()},
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'rps': round(len(timings) / sum(timings), 1),
+        'peak_kb': round(peak / 1024, 1),
+        'queries': queries,
+    }
+
+
+def run(size, args):
+    from django.core.cache import cache
+    from django.core.management import call_command
+
+    from api_yamdb.wsgi import application
+
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+    ids = seed(size, random.Random(args.seed))
+    ids.update(titles=size, counter=0)
+    return [
+        {'size': size, **bench_endpoint(
+            application, endpoint, ids, args.requests, args.warmup,
+            args.warm_cache,
+        )}
+        for endpoint in ENDPOINTS
+        if not args.only or endpoint[0] in args.only
+    ]
+
+
+def compare(results, baseline):
+    """Отношение p95 и rps к прошлому запуску по (размер, адрес)."""
+    previous = {
+        (item['size'], item['endpoint']): item for item in baseline['results']
+    }
+    for item in results:
+        old = previous.get((item['size'], item['endpoint']))
+        if old:
+            item['p95_ratio'] = round(item['p95_ms'] / old['p95_ms'], 2)
+            item['rps_ratio'] = round(item['rps'] / old['rps'], 2)
+
+
+def print_table(results):
+    for item in results:
+        line = (
+            f"{item['size']:>7} {item['endpoint']:<22} "
+            f"p50={item['p50_ms']:>8}ms p95={item['p95_ms']:>8}ms "
+            f"p99={item['p99_ms']:>8}ms {item['rps']:>8} rps "
+            f"{item['peak_kb']:>9} KiB q={item['queries']:<3} "
+            f"{item['statuses']}"
+        )
+        if 'p95_ratio' in item:
+            line += f" p95 x{item['p95_ratio']} rps x{item['rps_ratio']}"
+        print(line)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', default='100,1000',
+        type=lambda value: [int(size) for size in value.split(',')],
+        help='Число произведений и пользователей, через запятую.',
+    )
+    parser.add_argument('--requests', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*',
+                        help='Названия адресов для замера.')
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='Не очищать кэш ответов между запросами.')
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    parser.add_argument('--baseline',
+                        help='Файл результатов прошлого запуска.')
+    parser.add_argument('--json', action='store_true',
+                        help='Вывести результаты в формате JSON.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    import django
+    from django.test.utils import override_settings
+
+    results = []
+    # /metrics закрыт по умолчанию; замеры идут с локального адреса.
+    with override_settings(METRICS_ALLOWED_IPS=('127.0.0.1',)), \
+            test_database():
+        for size in args.sizes:
+            results.extend(run(size, args))
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            compare(results, json.load(file))
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(),
+        'django': django.get_version(),
+        'sizes': args.sizes,
+        'requests': args.requests,
+        'warm_cache': args.warm_cache,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == '__main__':
+    main()
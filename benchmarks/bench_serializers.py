@@ -0,0 +1,143 @@
+"""Сравнение скорости сериализаторов DRF и скомпилированного вывода.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_serializers --rows 2000 --repeat 5
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import setup_django, test_database
+
+
+def seed(rows):
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    # Первичные ключи задаются явно: SQLite не возвращает их из
+    # bulk_create.
+
+    categories = Category.objects.bulk_create(
+        Category(
+            id=idx + 1, name=f'Категория {idx}', slug=f'category-{idx}'
+        )
+        for idx in range(10)
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(id=idx + 1, name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(20)
+    )
+    users = User.objects.bulk_create(
+        User(
+            id=idx + 1, username=f'user{idx}',
+            email=f'user{idx}@yamdb.fake'
+        )
+        for idx in range(50)
+    )
+    titles = Title.objects.bulk_create(
+        Title(
+            id=idx + 1, name=f'Произведение {idx}', year=1900 + idx % 120,
+            category=categories[idx % len(categories)],
+            description='Описание произведения',
+            rating_sum=7 * (idx % 5), rating_count=idx % 5,
+        )
+        for idx in range(rows)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title=title, genre=genres[(idx + shift) % 20])
+        for idx, title in enumerate(titles)
+        for shift in range(3)
+    )
+    reviews = Review.objects.bulk_create(
+        Review(
+            id=idx + 1, title=titles[idx % len(titles)],
+            author=users[idx % len(users)],
+            text='Текст отзыва ' * 10, score=1 + idx % 10,
+        )
+        for idx in range(rows)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            review=reviews[idx % len(reviews)],
+            author=users[idx % len(users)], text='Комментарий',
+        )
+        for idx in range(rows)
+    )
+
+
+def measure(function, repeat):
+    """Лучшее время из repeat запусков."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from api.compiled import compile_serializer
+    from api.querysets import optimize_queryset
+    from api.serializers import (
+        CommentSerializer, ReviewSerializer, TitleGetSerializer
+    )
+    from reviews.models import Comment, Review, Title
+
+    seed(rows)
+    results = []
+    for serializer_class, model in (
+        (TitleGetSerializer, Title),
+        (ReviewSerializer, Review),
+        (CommentSerializer, Comment),
+    ):
+        objects = list(
+            optimize_queryset(model.objects.all(), serializer_class)
+        )
+        compiled = compile_serializer(serializer_class())
+        renderer = JSONRenderer()
+        drf_output = renderer.render(serializer_class(objects, many=True).data)
+        compiled_output = renderer.render([compiled(obj) for obj in objects])
+        assert drf_output == compiled_output, serializer_class.__name__
+        drf_time = measure(
+            lambda: serializer_class(objects, many=True).data, repeat
+        )
+        compiled_time = measure(
+            lambda: [compiled(obj) for obj in objects], repeat
+        )
+        results.append({
+            'serializer': serializer_class.__name__,
+            'rows': len(objects),
+            'drf_rows_per_sec': round(len(objects) / drf_time),
+            'compiled_rows_per_sec': round(len(objects) / compiled_time),
+            'speedup': round(drf_time / compiled_time, 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help='Вывести результаты в формате JSON.')
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for item in results:
+        print(
+            f"{item['serializer']:<20} rows={item['rows']:<7} "
+            f"drf={item['drf_rows_per_sec']:>8} rows/s  "
+            f"compiled={item['compiled_rows_per_sec']:>8} rows/s  "
+            f"x{item['speedup']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
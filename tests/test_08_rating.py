@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.views import ReviewViewSet
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingCounters:
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(user_client, titles[0]['id'], 'Так себе', 1)
+
+        response = admin_client.get(url)
+        assert response.json().get('rating') == 3, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'добавлении отзыва.'
+        )
+
+        admin_client.patch(
+            f'{url}reviews/{reviews[0]["id"]}/', data={'score': 9}
+        )
+        response = admin_client.get(url)
+        assert response.json().get('rating') == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        response = admin_client.get(url)
+        assert response.json().get('rating') == 1, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        user.delete()
+        response = admin_client.get(url)
+        assert response.json().get('rating') is None, (
+            'Проверьте, что при удалении всех отзывов значением поля '
+            '`rating` становится `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        out = StringIO()
+        call_command('rebuild_ratings', '--check', stdout=out)
+        assert 'Расхождений: 1' in out.getvalue(), (
+            'Проверьте, что команда `rebuild_ratings --check` находит '
+            'произведения с неверными счётчиками рейтинга.'
+        )
+
+        call_command('rebuild_ratings', stdout=StringIO())
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'счётчики рейтинга по таблице отзывов.'
+        )
+
+    def test_03_save_keeps_concurrent_counters(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        title = Title.objects.get(pk=titles[0]['id'])
+        version = title.version
+        Title.objects.filter(pk=title.pk).add_score(7)
+
+        title.name = 'Новое название'
+        title.save()
+        saved = Title.objects.get(pk=title.pk)
+        assert (saved.rating_sum, saved.rating_count) == (12, 2), (
+            'Проверьте, что сохранение произведения не затирает счётчики '
+            'рейтинга, изменённые другим запросом.'
+        )
+        assert saved.name == 'Новое название'
+        assert title.version == saved.version == version + 2, (
+            'Проверьте, что сохранение произведения увеличивает версию '
+            'в базе, не теряя параллельных увеличений.'
+        )
+
+    def test_04_concurrent_review_updates(self, monkeypatch, admin_client,
+                                          admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        review_id = reviews[0]['id']
+        get_object = ReviewViewSet.get_object
+
+        def stale_object(view):
+            # Отзыв загружен, и до сохранения его оценку меняет другой
+            # запрос.
+            review = get_object(view)
+            concurrent = Review.objects.get(pk=review_id)
+            concurrent.score = 9
+            concurrent.save()
+            return review
+
+        monkeypatch.setattr(ReviewViewSet, 'get_object', stale_object)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(f'{url}reviews/{review_id}/', data={'score': 7})
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что рейтинг не расходится с оценками при '
+            'параллельном изменении одного отзыва.'
+        )
@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def test_01_titles_cursor_pagination(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(7)
+        )
+        expected_ids = list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+        url = '/api/v1/titles/?pagination=cursor'
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data and data.get('next'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ссылку '
+            'на следующую страницу и не содержит ключ `count`.'
+        )
+        ids = [title['id'] for title in data['results']]
+
+        data = client.get(data['next']).json()
+        ids += [title['id'] for title in data['results']]
+        assert ids == expected_ids, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'произведения по возрастанию `id` без пропусков и повторов.'
+        )
+        assert data.get('next') is None, (
+            'Проверьте, что на последней странице курсорной пагинации '
+            'значение ключа `next` равно `None`.'
+        )
+
+    def test_02_page_number_pagination_is_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `pagination=cursor` используется '
+            'постраничная пагинация.'
+        )
+
+    def test_03_cursor_keyset_with_equal_dates(self, monkeypatch, client):
+        monkeypatch.setattr(
+            'api.pagination.KeysetCursorPagination.page_size', 5
+        )
+        title = Title.objects.create(name='Произведение', year=2000)
+        users = User.objects.bulk_create(
+            User(username=f'reader{idx}', email=f'reader{idx}@yamdb.fake')
+            for idx in range(23)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв', score=5)
+            for user in User.objects.filter(
+                username__in=[user.username for user in users]
+            )
+        )
+        # Как после load_csv: у всех отзывов одна дата публикации.
+        Review.objects.update(pub_date=timezone.now())
+        expected_ids = list(
+            Review.objects.order_by('-id').values_list('id', flat=True)
+        )
+
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor'
+        ids, pages = [], []
+        with CaptureQueriesContext(connection) as context:
+            while url:
+                data = client.get(url).json()
+                pages.append(data)
+                ids += [review['id'] for review in data['results']]
+                url = data['next']
+        assert ids == expected_ids, (
+            'Проверьте, что курсорная пагинация отзывов с одинаковой датой '
+            'возвращает все отзывы без пропусков и повторов.'
+        )
+        assert not any(
+            'OFFSET' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что курсорная пагинация выбирает страницы по ключу '
+            'сортировки, а не через OFFSET.'
+        )
+
+        data = client.get(pages[-1]['previous']).json()
+        assert data['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` курсорной пагинации ведёт на '
+            'предыдущую страницу.'
+        )
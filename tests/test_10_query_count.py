@@ -0,0 +1,28 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10QueryCount:
+
+    def test_01_list_queries_do_not_depend_on_rows(
+        self, client, admin_client, admin, user_client, user,
+        moderator_client, moderator, django_assert_max_num_queries
+    ):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, reviews, titles = create_comments(admin_client, author_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/',
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/',
+        )
+        for url in urls:
+            with django_assert_max_num_queries(4):
+                client.get(url)
@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def test_01_titles_search(self, admin_client, client):
+        categories = create_categories(admin_client)
+        url = '/api/v1/titles/'
+        titles = (
+            {'name': 'Ёлки', 'description': 'Новогодняя комедия'},
+            {'name': 'Ирония судьбы', 'description': 'Комедия, ёлка и баня'},
+            {'name': 'Ёлка и Метель', 'description': ''},
+        )
+        for data in titles:
+            data.update(year=2010, category=categories[0]['slug'], genre=[])
+            response = admin_client.post(url, data=data)
+            assert response.status_code == HTTPStatus.CREATED
+
+        response = client.get(url, {'search': 'ЕЛКИ'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с параметром `search` '
+            'возвращает ответ со статусом 200.'
+        )
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Ёлки'], (
+            f'Проверьте, что поиск по `{url}` не различает регистр и '
+            'буквы `ё` и `е`.'
+        )
+
+        response = client.get(url, {'search': 'ёлка'})
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Ёлка и Метель', 'Ирония судьбы'], (
+            f'Проверьте, что поиск по `{url}` учитывает описание и '
+            'ставит совпадения в названии выше совпадений в описании.'
+        )
+
+        response = client.get(url, {'search': 'комедия судьбы'})
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Ирония судьбы'], (
+            f'Проверьте, что поиск по `{url}` возвращает только '
+            'произведения, содержащие все слова запроса.'
+        )
+
+    def test_02_titles_fuzzy_search(self, admin_client, client):
+        categories = create_categories(admin_client)
+        url = '/api/v1/titles/fuzzy/'
+        for name in ('Терминатор', 'Крепкий орешек', 'The Godfather'):
+            data = {
+                'name': name,
+                'year': 1990,
+                'category': categories[0]['slug'],
+                'genre': [],
+            }
+            admin_client.post('/api/v1/titles/', data=data)
+
+        response = client.get(url, {'query': 'терминатар'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert [title['name'] for title in data] == ['Терминатор'], (
+            f'Проверьте, что `{url}` находит произведения по названию '
+            'с опечатками.'
+        )
+        assert 0 < data[0]['similarity'] < 1, (
+            f'Проверьте, что ответ `{url}` содержит поле `similarity`.'
+        )
+
+        response = client.get(url, {'query': 'godfater', 'limit': 1})
+        data = response.json()
+        assert [title['name'] for title in data] == ['The Godfather'], (
+            f'Проверьте, что `{url}` находит английские названия.'
+        )
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{url}` без параметра `query` '
+            'возвращает ответ со статусом 400.'
+        )
+
+    def test_03_users_prefix_search(self, admin_client, admin, user,
+                                    moderator):
+        url = '/api/v1/users/'
+        response = admin_client.get(url, {'search': 'testMOD'})
+        usernames = [item['username'] for item in response.json()['results']]
+        assert usernames == [moderator.username], (
+            f'Проверьте, что поиск по `{url}` находит пользователей по '
+            'началу имени без учёта регистра.'
+        )
+
+        response = admin_client.get(url, {'search': 'test'})
+        usernames = [item['username'] for item in response.json()['results']]
+        assert usernames == sorted(
+            (admin.username, user.username, moderator.username)
+        ), (
+            f'Проверьте, что поиск по `{url}` возвращает всех '
+            'пользователей с подходящим началом имени.'
+        )
+
+        response = admin_client.get(url, {'search': 'user'})
+        assert response.json()['results'] == [], (
+            f'Проверьте, что поиск по `{url}` ищет только по началу имени.'
+        )
@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFacets:
+
+    def test_01_title_facets(self, admin_client, client,
+                             django_assert_max_num_queries):
+        create_titles(admin_client)
+        url = '/api/v1/titles/facets/'
+
+        with django_assert_max_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json() == {
+            'genre': {'comedy': 1, 'drama': 1, 'horror': 1},
+            'category': {'books': 1, 'films': 1},
+            'year': {'1984': 1, '1988': 1},
+        }, (
+            f'Проверьте, что `{url}` возвращает количество произведений '
+            'по жанрам, категориям и годам.'
+        )
+
+        response = client.get(url, {'genre': 'horror'})
+        assert response.json() == {
+            'genre': {'comedy': 1, 'horror': 1},
+            'category': {'films': 1},
+            'year': {'1984': 1},
+        }, (
+            f'Проверьте, что `{url}` учитывает параметры фильтрации '
+            'произведений.'
+        )
+
+        response = client.get(url, {'year': 'никогда'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{url}` с некорректным фильтром возвращает '
+            'ответ со статусом 400.'
+        )
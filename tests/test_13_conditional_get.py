@@ -0,0 +1,87 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import ContentVersion, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def test_01_not_modified_lists(self, admin_client, client):
+        create_titles(admin_client)
+        for url in ('/api/v1/categories/', '/api/v1/genres/',
+                    '/api/v1/titles/'):
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert etag and response.get('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовки `ETag` и `Last-Modified`.'
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+
+    def test_02_etag_changes_on_write(self, admin_client, client,
+                                      user_client,
+                                      django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        other_etag = client.get(f'/api/v1/titles/{titles[1]["id"]}/')['ETag']
+
+        with django_assert_max_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что ответ 304 на GET-запрос к `{url}` отдаётся '
+            'без выполнения основного запроса к базе.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 10)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после нового отзыва GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает актуальные данные.'
+        )
+        response = client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            HTTP_IF_NONE_MATCH=other_etag
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв на одно произведение не сбрасывает '
+            '`ETag` других произведений.'
+        )
+
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Мюзикл', 'slug': 'musical'}
+        )
+        etag = client.get('/api/v1/genres/')['ETag']
+        admin_client.delete('/api/v1/genres/musical/')
+        response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление жанра меняет `ETag` списка жанров.'
+        )
+
+    def test_03_last_modified_follows_object(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        hour_ago = timezone.now() - timedelta(hours=1)
+        ContentVersion.objects.update(modified=hour_ago)
+        Title.objects.update(modified=hour_ago)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        admin_client.patch(url, data={'name': 'Новое название'})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения произведения GET-запрос к '
+            f'`{url}` со старым `If-Modified-Since` возвращает актуальные '
+            'данные.'
+        )
+        assert response.json()['name'] == 'Новое название'
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ResponseCache:
+
+    def test_01_list_cache_invalidation(self, admin_client, admin, client,
+                                        user_client,
+                                        django_assert_max_num_queries):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response['X-Cache'] == 'MISS'
+            with django_assert_max_num_queries(1):
+                cached = client.get(url)
+            assert cached['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдаётся '
+                'из кэша.'
+            )
+            assert cached.json() == response.json(), (
+                f'Проверьте, что ответ из кэша для `{url}` совпадает с '
+                'исходным.'
+            )
+            response = client.get(url, {'page': 1})
+            assert response['X-Cache'] == 'MISS', (
+                f'Проверьте, что ключ кэша для `{url}` учитывает '
+                'параметры запроса.'
+            )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(user_client, titles[0]['id'], 'Скучно', 2)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            f'Проверьте, что новый отзыв сбрасывает кэш `{url}`.'
+        )
+        assert response.json()['count'] == 2
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений.'
+        )
+
+        response = admin_client.get('/api/v1/cache/stats/')
+        assert response.status_code == HTTPStatus.OK
+        stats = response.json()
+        assert stats['hits'] == 4 and stats['misses'] == 10, (
+            'Проверьте, что `/api/v1/cache/stats/` возвращает счётчики '
+            'попаданий и промахов кэша.'
+        )
+        response = client.get('/api/v1/cache/stats/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,69 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from api.compiled import compile_serializer
+from api.serializers import (
+    CommentSerializer, ReviewSerializer, TitleGetSerializer
+)
+from reviews.models import Comment, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15CompiledSerializers:
+
+    def test_01_compiled_output_is_identical(self, admin_client, admin,
+                                             user_client, user):
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        Title.objects.create(name='Без категории', year=2000)
+        cases = (
+            (TitleGetSerializer, Title.objects.all()),
+            (ReviewSerializer, Review.objects.all()),
+            (CommentSerializer, Comment.objects.all()),
+        )
+        for serializer_class, queryset in cases:
+            compiled = compile_serializer(serializer_class())
+            expected = JSONRenderer().render(
+                serializer_class(queryset, many=True).data
+            )
+            actual = JSONRenderer().render(
+                [compiled(instance) for instance in queryset]
+            )
+            assert actual == expected, (
+                'Проверьте, что скомпилированный вывод '
+                f'`{serializer_class.__name__}` совпадает с выводом DRF.'
+            )
+
+    def test_02_compiled_mode_in_api(self, admin_client, admin, client,
+                                     settings):
+        create_comments(admin_client, {admin: admin_client})
+        urls = ('/api/v1/titles/', '/api/v1/titles/1/reviews/',
+                '/api/v1/titles/1/reviews/1/comments/')
+        expected = [client.get(url).content for url in urls]
+        settings.COMPILED_SERIALIZERS = True
+        cache.clear()
+        actual = [client.get(url).content for url in urls]
+        assert actual == expected, (
+            'Проверьте, что режим COMPILED_SERIALIZERS не меняет ответы API.'
+        )
+
+    def test_03_values_read_mode_in_api(self, admin_client, admin, client,
+                                        user_client, user, settings,
+                                        django_assert_max_num_queries):
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        Title.objects.create(name='Без категории', year=2000)
+        urls = ('/api/v1/titles/', '/api/v1/titles/?genre=horror',
+                '/api/v1/titles/?pagination=cursor',
+                '/api/v1/titles/1/reviews/',
+                '/api/v1/titles/1/reviews/1/comments/')
+        expected = [client.get(url).content for url in urls]
+        settings.VALUES_READ_MODE = True
+        cache.clear()
+        actual = []
+        for url in urls:
+            with django_assert_max_num_queries(5):
+                actual.append(client.get(url).content)
+        assert actual == expected, (
+            'Проверьте, что режим VALUES_READ_MODE не меняет ответы API.'
+        )
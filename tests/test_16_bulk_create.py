@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16BulkCreate:
+
+    def test_01_titles_bulk(self, admin_client, user_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/bulk/'
+        data = [
+            {
+                'name': 'Чужой',
+                'year': 1979,
+                'category': categories[0]['slug'],
+                'genre': [genres[0]['slug']],
+                'description': 'В космосе никто не услышит твой крик',
+            },
+            {
+                'name': titles[0]['name'],
+                'year': 1984,
+                'category': 'unknown',
+                'genre': ['unknown'],
+            },
+            {'name': 'Без года'},
+        ]
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос пользователя к `{url}` '
+            'возвращает ответ со статусом 403.'
+        )
+
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{url}` с '
+            'корректными элементами возвращает ответ со статусом 201.'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [201, 400, 400], (
+            f'Проверьте, что `{url}` возвращает результат для каждого '
+            'элемента.'
+        )
+        assert set(results[1]['errors']) == {'name', 'category', 'genre'}
+        assert set(results[2]['errors']) == {'year', 'category', 'genre'}
+
+        response = client.get(f'/api/v1/titles/{results[0]["data"]["id"]}/')
+        assert response.json()['genre'] == [genres[0]], (
+            f'Проверьте, что `{url}` сохраняет жанры произведений.'
+        )
+        response = client.get('/api/v1/titles/', {'search': 'космосе'})
+        assert response.json()['count'] == 1, (
+            f'Проверьте, что произведения из `{url}` попадают в поиск.'
+        )
+
+    def test_02_reviews_and_comments_bulk(self, admin_client, admin,
+                                          user_client, user, client,
+                                          django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk/'
+        data = [
+            {'text': 'Мой отзыв', 'score': 4},
+            {'text': 'От имени пользователя', 'score': 10,
+             'author': user.username},
+            {'text': 'Повтор', 'score': 1, 'author': user.username},
+            {'text': 'Нет автора', 'score': 1, 'author': 'nobody'},
+            {'score': 11},
+        ]
+        with django_assert_max_num_queries(15):
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        results = response.json()
+        assert [item['status'] for item in results] == [
+            201, 201, 400, 400, 400
+        ], (
+            f'Проверьте, что `{url}` проверяет автора, оценку и '
+            'повторные отзывы.'
+        )
+        assert results[1]['data']['author'] == user.username
+
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 7, (
+            f'Проверьте, что отзывы из `{url}` учитываются в рейтинге.'
+        )
+
+        response = user_client.post(
+            url, data=[{'text': 'Чужой', 'score': 5, 'author': 'TestAdmin'}],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что указывать автора в пакетном создании может '
+            'только администратор.'
+        )
+
+        review_id = results[0]['data']['id']
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review_id}/comments/'
+        )
+        response = user_client.post(
+            f'{url}bulk/', data=[{'text': f'Комментарий {idx}'}
+                                 for idx in range(3)],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        created = [item['data'] for item in response.json()]
+        listed = client.get(url).json()['results']
+        assert sorted(created, key=lambda item: item['id']) == sorted(
+            listed, key=lambda item: item['id']
+        ), (
+            'Проверьте, что пакетное создание комментариев возвращает '
+            'данные созданных объектов.'
+        )
@@ -0,0 +1,90 @@
+import csv
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb/static/data'
+
+
+def read_rows(filename):
+    with open(DATA_DIR / filename, encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17LoadCsv:
+
+    def test_01_load_static_data(self, client):
+        out = StringIO()
+        call_command('load_csv', '--batch-size', '7', stdout=out)
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда `load_csv` выводит скорость загрузки.'
+        )
+        # В файле два произведения «Generation П»: второе нарушает
+        # уникальность названия и пропускается вместе с отзывами.
+        names = {}
+        for row in read_rows('titles.csv'):
+            names.setdefault(row['name'], row['id'])
+        titles = set(names.values())
+        reviews = {
+            row['id'] for row in read_rows('review.csv')
+            if row['title_id'] in titles
+        }
+        expected = (
+            (User, len(read_rows('users.csv'))),
+            (Title, len(titles)),
+            (Review, len(reviews)),
+            (Comment, sum(
+                row['review_id'] in reviews
+                for row in read_rows('comments.csv')
+            )),
+        )
+        for model, count in expected:
+            assert model.objects.count() == count, (
+                'Проверьте, что команда `load_csv` загружает '
+                f'`{model.__name__}`.'
+            )
+        assert 'пропущено' in out.getvalue(), (
+            'Проверьте, что команда `load_csv` сообщает о пропущенных '
+            'строках.'
+        )
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `load_csv` сохраняет даты публикации.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.rating == sum(scores) / len(scores), (
+            'Проверьте, что после `load_csv` рейтинг произведений '
+            'пересчитан.'
+        )
+
+        response = client.get('/api/v1/titles/', {'search': 'шоушенка'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что произведения из `load_csv` попадают в поиск.'
+        )
+        response = client.get('/api/v1/titles/', {'search': 'крестный'})
+        assert response.json()['count'] == 1
+        assert User.objects.filter(username_key='capt_obvious').exists()
+
+    def test_02_skip_orphans(self, tmp_path):
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Чужой,1979,\n', encoding='utf-8'
+        )
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Текст,100,5,2020-01-01T00:00:00Z\n', encoding='utf-8'
+        )
+        out = StringIO()
+        call_command('load_csv', '--path', str(tmp_path), stdout=out)
+        assert Title.objects.count() == 1
+        assert not Review.objects.exists(), (
+            'Проверьте, что `load_csv` пропускает строки с несуществующими '
+            'связями.'
+        )
+        assert 'пропущено' in out.getvalue()
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from reviews.models import Category, Genre, ImportJob, Title
+
+HEADER = (
+    'title_name,title_year,title_description,genre_slug,genre_name,'
+    'category_slug,category_name\n'
+)
+
+
+def post_csv(client, content):
+    response = client.post('/api/v1/imports/', data={
+        'csv_file': SimpleUploadedFile(
+            'titles.csv', content.encode('utf-8'), content_type='text/csv'
+        ),
+    })
+    call_command('run_import_jobs', '--once', stdout=StringIO())
+    return response
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ImportCsv:
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+
+    def test_01_import(self, settings, client, admin_client,
+                       django_assert_max_num_queries):
+        settings.IMPORT_CSV_CHUNK_SIZE = 50
+        Genre.objects.create(name='Драма', slug='drama')
+        rows = ''.join(
+            f'Фильм {idx},{1990 + idx % 30},Описание,'
+            f'{"drama" if idx % 2 else "comedy"},'
+            f'{"Драма" if idx % 2 else "Комедия"},movie,Фильм\n'
+            for idx in range(100)
+        )
+        rows += 'Фильм 1,2000,,comedy,Комедия,movie,Фильм\n'
+        rows += 'Без года,,,drama,Драма,movie,Фильм\n'
+        rows += 'Из будущего,3000,,drama,Драма,movie,Фильм\n'
+        rows += 'Плохой слаг,2000,,не слаг,Драма,movie,Фильм\n'
+        rows += f'Длинный жанр,2000,,long,{"Ж" * 51},movie,Фильм\n'
+        rows += f'Длинный слаг,2000,,{"s" * 51},Длинный,movie,Фильм\n'
+        with django_assert_max_num_queries(80):
+            response = post_csv(admin_client, HEADER + rows)
+        assert response.status_code == HTTPStatus.ACCEPTED
+        assert Title.objects.count() == 100, (
+            'Проверьте, что импорт создаёт произведения и '
+            'пропускает некорректные строки.'
+        )
+        assert set(Genre.objects.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }
+        assert Category.objects.count() == 1
+        title = Title.objects.get(name='Фильм 1')
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }, (
+            'Проверьте, что импорт связывает произведения со всеми '
+            'жанрами из файла.'
+        )
+        assert title.category.slug == 'movie' and title.year == 1991
+        job = ImportJob.objects.get()
+        assert response.json()['id'] == job.pk, (
+            'Проверьте, что импорт возвращает номер задачи.'
+        )
+        assert (job.status, job.rows_processed, job.rows_invalid) == (
+            ImportJob.Status.DONE, 106, 5
+        ), (
+            'Проверьте, что импорт считает некорректными строки '
+            'со слишком длинными значениями.'
+        )
+
+        response = client.get('/api/v1/titles/', {'search': 'фильм 42'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что произведения из импорт попадают в поиск.'
+        )
+
+        response = post_csv(admin_client, HEADER + rows)
+        assert Title.objects.count() == 100
+        assert Title.genre.through.objects.count() == 101, (
+            'Проверьте, что повторный импорт не создаёт дубликатов.'
+        )
+
+    def test_02_missing_columns(self, admin_client):
+        post_csv(admin_client, 'title_name,genre_slug\nЧужой,horror\n')
+        job = ImportJob.objects.get()
+        assert job.status == ImportJob.Status.FAILED and job.error, (
+            'Проверьте, что импорт файла без нужных колонок завершается '
+            'ошибкой.'
+        )
+        assert not Title.objects.exists()
+
+    def test_03_empty_file(self):
+        job = ImportJob.objects.create(chunk_size=10)
+        job.file.save('titles.csv', ContentFile(b''))
+        call_command('run_import_jobs', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        assert job.status == ImportJob.Status.FAILED and job.error, (
+            'Проверьте, что импорт пустого файла завершается ошибкой.'
+        )
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.utils import timezone
+
+from reviews.imports import import_titles_chunk, read_chunks
+from reviews.models import ImportJob, Title
+
+HEADER = (
+    'title_name,title_year,genre_slug,genre_name,category_slug,'
+    'category_name\n'
+)
+
+
+def make_csv(count):
+    return HEADER + ''.join(
+        f'Книга {idx},2000,novel,Роман,book,Книга\n' for idx in range(count)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ImportJobs:
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        settings.IMPORT_CSV_CHUNK_SIZE = 10
+
+    def test_01_job_api(self, admin_client, user_client):
+        url = '/api/v1/imports/'
+        upload = SimpleUploadedFile('books.csv', make_csv(25).encode())
+        response = user_client.post(url, {'csv_file': upload})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что POST-запрос пользователя к `{url}` '
+            'возвращает ответ со статусом 403.'
+        )
+        upload.seek(0)
+        response = admin_client.post(url, {'csv_file': upload})
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            f'Проверьте, что POST-запрос администратора к `{url}` '
+            'возвращает ответ со статусом 202.'
+        )
+        job_id = response.json()['id']
+        assert response.json()['status'] == 'pending'
+        assert not Title.objects.exists(), (
+            'Проверьте, что файл импортируется в фоне, а не в запросе.'
+        )
+
+        call_command('run_import_jobs', '--once', stdout=StringIO())
+        response = admin_client.get(f'{url}{job_id}/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['status'] == 'done' and data['rows_processed'] == 25, (
+            f'Проверьте, что `{url}{{id}}/` возвращает прогресс задачи.'
+        )
+        assert data['chunks_done'] == 3 and data['rows_per_second'] > 0
+        assert data['stats'] == {
+            'genres': 1, 'categories': 1, 'titles': 25, 'links': 25
+        }
+        assert Title.objects.count() == 25
+
+    def test_02_resume_after_crash(self):
+        job = ImportJob.objects.create(chunk_size=10)
+        job.file.save('books.csv', ContentFile(make_csv(30).encode()))
+        # Обработчик упал после первой части: её строки сохранены,
+        # отметка обработчика устарела.
+        with job.file.open('rb') as file:
+            import_titles_chunk(next(read_chunks(file, 10)))
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.Status.RUNNING, chunks_done=1,
+            rows_processed=10,
+            heartbeat=timezone.now() - timedelta(hours=1),
+        )
+        fresh = ImportJob.objects.create(
+            chunk_size=10, status=ImportJob.Status.RUNNING,
+            heartbeat=timezone.now(),
+        )
+
+        out = StringIO()
+        call_command('run_import_jobs', '--once', stdout=out)
+        job.refresh_from_db()
+        assert 'начата с части 2' in out.getvalue(), (
+            'Проверьте, что прерванная задача продолжается с последней '
+            'сохранённой части.'
+        )
+        assert (job.status, job.rows_processed, job.chunks_done) == (
+            ImportJob.Status.DONE, 30, 3
+        )
+        assert Title.objects.count() == 30
+        fresh.refresh_from_db()
+        assert fresh.status == ImportJob.Status.RUNNING, (
+            'Проверьте, что задачи с живым обработчиком не перехватываются.'
+        )
+
+    def test_03_unexpected_error_fails_job(self, monkeypatch):
+        broken = ImportJob.objects.create(chunk_size=10)
+        broken.file.save('books.csv', ContentFile(make_csv(5).encode()))
+        job = ImportJob.objects.create(chunk_size=10)
+        job.file.save('books.csv', ContentFile(make_csv(5).encode()))
+
+        def fail_once(chunk):
+            monkeypatch.undo()
+            raise DatabaseError('database is locked')
+
+        monkeypatch.setattr('reviews.imports.import_titles_chunk', fail_once)
+        call_command('run_import_jobs', '--once', stdout=StringIO())
+        broken.refresh_from_db()
+        assert broken.status == ImportJob.Status.FAILED, (
+            'Проверьте, что непредвиденная ошибка завершает задачу '
+            'импорта со статусом failed.'
+        )
+        assert 'database is locked' in broken.error
+        job.refresh_from_db()
+        assert job.status == ImportJob.Status.DONE, (
+            'Проверьте, что ошибка одной задачи не останавливает '
+            'обработку остальных.'
+        )
@@ -0,0 +1,99 @@
+import csv
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Review
+from tests.utils import create_comments, create_single_review
+
+
+def read_stream(response):
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся потоковым ответом.'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Export:
+
+    def test_01_export_formats(self, settings, admin_client, admin,
+                               user_client, user, moderator_client,
+                               moderator):
+        settings.EXPORT_CHUNK_SIZE = 2
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        create_single_review(user_client, titles[1]['id'], 'Другой', 9)
+
+        url = '/api/v1/export/reviews.csv'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(read_stream(response).splitlines()))
+        assert len(rows) == len(reviews) + 1, (
+            f'Проверьте, что `{url}` выгружает все отзывы.'
+        )
+        assert {row['author'] for row in rows} == {
+            admin.username, user.username, moderator.username
+        }
+
+        response = admin_client.get(url, {'title': titles[1]['id']})
+        rows = list(csv.DictReader(read_stream(response).splitlines()))
+        assert [row['text'] for row in rows] == ['Другой'], (
+            f'Проверьте, что `{url}` фильтрует отзывы по произведению.'
+        )
+
+        url = '/api/v1/export/comments.ndjson'
+        response = admin_client.get(url, {'title': titles[0]['id']})
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        items = list(map(json.loads, read_stream(response).splitlines()))
+        assert sorted(item['id'] for item in items) == sorted(
+            comment['id'] for comment in comments
+        ), f'Проверьте, что `{url}` выгружает комментарии в NDJSON.'
+        assert items[0]['title_id'] == titles[0]['id']
+
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        items = {
+            item['id']: item
+            for item in map(json.loads, read_stream(response).splitlines())
+        }
+        assert items[titles[0]['id']]['rating'] == 5
+        assert items[titles[1]['id']]['rating'] == 9, (
+            'Проверьте, что выгрузка произведений содержит рейтинг.'
+        )
+
+        response = admin_client.get('/api/v1/export/users.csv')
+        rows = list(csv.DictReader(read_stream(response).splitlines()))
+        assert admin.username in {row['username'] for row in rows}
+
+    def test_02_date_range(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        old_date = timezone.now() - timedelta(days=30)
+        Review.objects.filter(pk=reviews[0]['id']).update(pub_date=old_date)
+
+        url = '/api/v1/export/reviews.csv'
+        after = (old_date + timedelta(days=1)).date().isoformat()
+        response = admin_client.get(url, {'pub_date_after': after})
+        rows = list(csv.DictReader(read_stream(response).splitlines()))
+        assert [int(row['id']) for row in rows] == [reviews[1]['id']], (
+            f'Проверьте, что `{url}` фильтрует отзывы по дате публикации.'
+        )
+
+        response = admin_client.get(url, {'pub_date_after': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get('/api/v1/export/secrets.csv')
+        assert response.status_code == HTTPStatus.NOT_FOUND
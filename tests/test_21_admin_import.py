@@ -0,0 +1,156 @@
+import pytest
+import tablib
+
+from reviews.import_export import (
+    GenreTitleResource, ReviewResource, TitleResource, UserResource
+)
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.versions import get_versions
+
+
+def make_titles(count):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.create(name='Драма', slug='drama')
+    return tablib.Dataset(
+        *[(idx, f'Фильм {idx}', 2000, category.pk, '')
+          for idx in range(1, count + 1)],
+        headers=('id', 'name', 'year', 'category', 'description'),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21AdminImport:
+
+    def test_01_dry_run_without_row_queries(
+        self, django_assert_max_num_queries
+    ):
+        dataset = make_titles(50)
+        with django_assert_max_num_queries(25):
+            result = TitleResource().import_data(dataset, dry_run=True)
+        assert not result.has_errors() and not result.has_validation_errors()
+        assert not Title.objects.exists(), (
+            'Проверьте, что предпросмотр импорта не сохраняет данные.'
+        )
+
+        TitleResource().import_data(dataset)
+        dataset = tablib.Dataset(
+            *[(row[0], row[1] + ' (режиссёрская версия)', *row[2:])
+              for row in dataset],
+            headers=dataset.headers,
+        )
+        with django_assert_max_num_queries(25):
+            result = TitleResource().import_data(dataset, dry_run=True)
+        assert result.totals['update'] == 50, (
+            'Проверьте, что предпросмотр изменений существующих объектов '
+            'выполняется без запросов на каждую строку.'
+        )
+        assert all(row.diff for row in result.rows)
+
+    def test_02_import_keeps_derived_data(self, client, user, admin,
+                                          django_assert_max_num_queries):
+        dataset = make_titles(20)
+        with django_assert_max_num_queries(25):
+            result = TitleResource().import_data(dataset)
+        assert result.totals['new'] == 20 and Title.objects.count() == 20
+        response = client.get('/api/v1/titles/', {'search': 'фильм 7'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что импортированные произведения попадают в поиск.'
+        )
+
+        links = tablib.Dataset(
+            ('', 'Драма', 'Фильм 1'), ('', 'Драма', 'Фильм 2'),
+            headers=('id', 'genre', 'title'),
+        )
+        result = GenreTitleResource().import_data(links)
+        assert not result.has_errors()
+        assert Title.objects.get(name='Фильм 1').genre.get().slug == 'drama'
+
+        title = Title.objects.get(name='Фильм 1')
+        reviews = tablib.Dataset(
+            ('', title.pk, user.pk, 'Хорошо', 8, ''),
+            ('', title.pk, admin.pk, 'Плохо', 2, ''),
+            headers=('id', 'title', 'author', 'text', 'score', 'pub_date'),
+        )
+        version = get_versions(['review'])['review'][0]
+        result = ReviewResource().import_data(reviews)
+        assert not result.has_errors() and Review.objects.count() == 2
+        title.refresh_from_db()
+        assert title.rating == 5, (
+            'Проверьте, что импорт отзывов пересчитывает рейтинг.'
+        )
+        assert get_versions(['review'])['review'][0] > version
+
+        users = tablib.Dataset(
+            ('', 'NewUser', 'new@yamdb.fake', 'user'),
+            headers=('id', 'username', 'email', 'role'),
+        )
+        result = UserResource().import_data(users)
+        assert not result.has_errors()
+        assert User.objects.get(username='NewUser').username_key == 'newuser'
+
+    def test_03_export_in_fixed_queries(self, monkeypatch,
+                                        django_assert_num_queries):
+        TitleResource().import_data(make_titles(30))
+        drama = Genre.objects.get()
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        for title in Title.objects.all():
+            title.genre.add(drama, *([comedy] if title.pk % 2 else []))
+
+        monkeypatch.setattr(TitleResource._meta, 'chunk_size', 20)
+        resource = TitleResource()
+        # По запросу произведений и жанров на каждую из двух частей.
+        with django_assert_num_queries(4):
+            data = resource.export(queryset=Title.objects.all())
+        genres = dict(zip(data['name'], data['genres']))
+        assert genres['Фильм 1'] == 'Драма,Комедия', (
+            'Проверьте, что экспорт произведений выводит их жанры.'
+        )
+        assert genres['Фильм 2'] == 'Драма'
+
+        with django_assert_num_queries(1):
+            data = GenreTitleResource().export(
+                queryset=Title.genre.through.objects.all()
+            )
+        assert len(data) == 45 and ('Комедия', 'Фильм 1') in list(
+            zip(data['genre'], data['title'])
+        ), (
+            'Проверьте, что экспорт связей жанров и произведений выводит '
+            'названия одним запросом.'
+        )
+
+    def test_04_update_import_saves_rows(self, user):
+        TitleResource().import_data(make_titles(3))
+        versions = dict(Title.objects.values_list('pk', 'version'))
+        dataset = tablib.Dataset(
+            *[(pk, f'Фильм {pk} (ремастер)', 2001, '', 'Новое')
+              for pk in versions],
+            headers=('id', 'name', 'year', 'category', 'description'),
+        )
+        result = TitleResource().import_data(dataset)
+        assert not result.has_errors() and result.totals['update'] == 3, (
+            'Проверьте, что импорт изменений существующих произведений '
+            'выполняется без ошибок.'
+        )
+        for title in Title.objects.all():
+            assert (title.name, title.year, title.description) == (
+                f'Фильм {title.pk} (ремастер)', 2001, 'Новое'
+            ), 'Проверьте, что импорт сохраняет изменения произведений.'
+            assert title.category is None
+            assert title.version > versions[title.pk], (
+                'Проверьте, что импорт изменений увеличивает версию '
+                'произведения.'
+            )
+
+        users = tablib.Dataset(
+            (user.pk, 'Renamed', 'renamed@yamdb.fake', 'moderator'),
+            headers=('id', 'username', 'email', 'role'),
+        )
+        result = UserResource().import_data(users)
+        assert not result.has_errors(), (
+            'Проверьте, что импорт изменений пользователей выполняется без '
+            'ошибок.'
+        )
+        user.refresh_from_db()
+        assert (user.username, user.username_key, user.role) == (
+            'Renamed', 'renamed', 'moderator'
+        ), 'Проверьте, что импорт сохраняет изменения пользователей.'
@@ -0,0 +1,171 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import (
+    Category, Review, Title, TitleToken, TitleTrigram, Tombstone, User
+)
+from tests.utils import create_reviews, create_titles
+
+
+def sync_all(client, url, cursor=None, limit=2):
+    """Проходит все страницы синхронизации от курсора."""
+    items = []
+    while True:
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        data = client.get(url, params).json()
+        items.extend(data['changes'])
+        cursor = data['cursor']
+        if not data['has_more']:
+            return items, cursor
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Sync:
+
+    @pytest.fixture(autouse=True)
+    def no_settle(self, settings):
+        settings.SYNC_SETTLE_SECONDS = 0
+
+    def test_01_changes_and_deletions(self, admin_client, user_client):
+        url = '/api/v1/sync/titles/'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+        titles, _, _ = create_titles(admin_client)
+        extra = Title.objects.create(name='Третий', year=2000)
+
+        items, cursor = sync_all(admin_client, url)
+        assert [item['id'] for item in items] == [
+            titles[0]['id'], titles[1]['id'], extra.pk
+        ], (
+            f'Проверьте, что `{url}` отдаёт все произведения по страницам.'
+        )
+        assert items[0]['op'] == 'upsert'
+        assert items[0]['data']['name'] == 'Терминатор'
+
+        items, same_cursor = sync_all(admin_client, url, cursor)
+        assert items == [] and same_cursor == cursor, (
+            'Проверьте, что без изменений синхронизация ничего не отдаёт '
+            'и возвращает тот же курсор.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'year': 1990}
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        items, cursor = sync_all(admin_client, url, cursor)
+        assert [(item['op'], item['id']) for item in items] == [
+            ('upsert', titles[1]['id']), ('delete', titles[0]['id'])
+        ], (
+            f'Проверьте, что `{url}` отдаёт изменения и удаления после '
+            'курсора в порядке времени.'
+        )
+        assert items[0]['data']['year'] == 1990
+
+    def test_02_reviews_update_title_rating(self, admin_client, admin,
+                                            user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        _, titles_cursor = sync_all(admin_client, '/api/v1/sync/titles/')
+        _, cursor = sync_all(admin_client, '/api/v1/sync/reviews/')
+
+        Review.objects.get(pk=reviews[0]['id']).delete()
+        items, _ = sync_all(admin_client, '/api/v1/sync/reviews/', cursor)
+        assert [(item['op'], item['id']) for item in items] == [
+            ('delete', reviews[0]['id'])
+        ], 'Проверьте, что удаление отзыва попадает в синхронизацию.'
+        assert Tombstone.objects.filter(collection='comments').count() == 0
+
+        items, _ = sync_all(
+            admin_client, '/api/v1/sync/titles/', titles_cursor
+        )
+        assert [item['id'] for item in items] == [titles[0]['id']], (
+            'Проверьте, что пересчёт рейтинга отмечает произведение '
+            'изменённым.'
+        )
+        assert items[0]['data']['rating_count'] == 1
+
+    def test_03_since_and_errors(self, admin_client):
+        url = '/api/v1/sync/titles/'
+        old = Title.objects.create(name='Старый', year=1950)
+        Title.objects.filter(pk=old.pk).update(
+            modified=timezone.now() - timedelta(days=2)
+        )
+        new = Title.objects.create(name='Новый', year=2020)
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        data = admin_client.get(url, {'since': since}).json()
+        assert [item['id'] for item in data['changes']] == [new.pk], (
+            f'Проверьте, что `{url}?since=` отдаёт только изменения после '
+            'указанной даты.'
+        )
+
+        for params in ({'cursor': 'мусор'}, {'since': 'вчера'},
+                       {'limit': 100000}):
+            response = admin_client.get(url, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{url}` отвечает 400 на неверный '
+                f'параметр {params}.'
+            )
+        response = admin_client.get('/api/v1/sync/users/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_related_keys_resync(self, admin_client, admin, user_client,
+                                    user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        _, titles_cursor = sync_all(admin_client, '/api/v1/sync/titles/')
+        _, reviews_cursor = sync_all(admin_client, '/api/v1/sync/reviews/')
+
+        category = Category.objects.get(title__pk=titles[0]['id'])
+        category.slug = 'renamed'
+        category.save()
+        items, _ = sync_all(
+            admin_client, '/api/v1/sync/titles/', titles_cursor
+        )
+        assert {item['data']['category'] for item in items} == {
+            'renamed'
+        } and items, (
+            'Проверьте, что смена slug категории отправляет её '
+            'произведения в синхронизацию заново.'
+        )
+
+        author = User.objects.get(pk=user.pk)
+        author.username = 'renamed'
+        author.save()
+        items, _ = sync_all(
+            admin_client, '/api/v1/sync/reviews/', reviews_cursor
+        )
+        assert [item['data']['author'] for item in items] == ['renamed'], (
+            'Проверьте, что смена имени пользователя отправляет его отзывы '
+            'в синхронизацию заново.'
+        )
+
+    def test_05_search_rows_deleted_in_one_query(self, admin_client):
+        create_titles(admin_client)
+        for model in (TitleToken, TitleTrigram):
+            assert not post_delete.has_listeners(model), (
+                'Проверьте, что приёмники удаления подключены только к '
+                'синхронизируемым моделям.'
+            )
+            with CaptureQueriesContext(connection) as context:
+                model.objects.all().delete()
+            assert [
+                query['sql'].split()[0]
+                for query in context.captured_queries
+                if query['sql'].startswith(('SELECT', 'DELETE'))
+            ] == ['DELETE'], (
+                'Проверьте, что строки поискового индекса удаляются одним '
+                'DELETE без выборки.'
+            )
@@ -0,0 +1,250 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import pagination
+
+from reviews.models import (
+    Category, Comment, Genre, ImportJob, Review, Title, User
+)
+
+
+def token_data(username):
+    user = User.objects.get(username=username)
+    return {
+        'username': username,
+        'confirmation_code': default_token_generator.make_token(user),
+    }
+
+
+def titles_payload(ids):
+    return [
+        {'name': f'Пакет {ids["n"]}-{idx}', 'year': 2020,
+         'genre': [ids['genre']], 'category': ids['category']}
+        for idx in range(ids['n'])
+    ]
+
+
+def reviews_payload(ids):
+    return [
+        {'text': f'Отзыв {idx}', 'score': 5, 'author': f'reader{idx}'}
+        for idx in range(ids['n'])
+    ]
+
+
+def comments_payload(ids):
+    return [{'text': f'Комментарий {idx}'} for idx in range(ids['n'])]
+
+
+def csv_upload(ids):
+    rows = ''.join(
+        f'Файл {ids["n"]}-{idx},2000,novel,Роман,book,Книга\n'
+        for idx in range(ids['n'])
+    )
+    return {'csv_file': SimpleUploadedFile('titles.csv', (
+        'title_name,title_year,genre_slug,genre_name,category_slug,'
+        'category_name\n' + rows
+    ).encode())}
+
+
+# Маршруты api/urls.py и /metrics: (название, клиент, метод, адрес, данные,
+# ожидаемый статус, наибольшее число запросов к базе). Адрес и данные
+# заполняются ключами из seed(); данные-функции вызываются до замера.
+# Пакетные маршруты и импорт получают тем больше элементов, чем больше
+# объём, поэтому проверка равенства числа запросов ловит запросы на
+# элемент пакета.
+ROUTES = [
+    ('signup', 'client', 'post', '/api/v1/auth/signup/',
+     lambda ids: {'username': f'guest{ids["n"]}',
+                  'email': f'guest{ids["n"]}@yamdb.fake'},
+     HTTPStatus.OK, 4),
+    ('token', 'client', 'post', '/api/v1/auth/token/',
+     lambda ids: token_data(ids['username']), HTTPStatus.OK, 2),
+    ('users-list', 'admin_client', 'get', '/api/v1/users/', None,
+     HTTPStatus.OK, 3),
+    ('users-detail', 'admin_client', 'get', '/api/v1/users/{username}/',
+     None, HTTPStatus.OK, 2),
+    ('users-create', 'admin_client', 'post', '/api/v1/users/',
+     lambda ids: {'username': f'new{ids["n"]}',
+                  'email': f'new{ids["n"]}@yamdb.fake'},
+     HTTPStatus.CREATED, 5),
+    ('users-me', 'user_client', 'get', '/api/v1/users/me/', None,
+     HTTPStatus.OK, 1),
+    ('users-me-patch', 'user_client', 'patch', '/api/v1/users/me/',
+     lambda ids: {'bio': f'О себе {ids["n"]}'}, HTTPStatus.OK, 3),
+    ('categories-list', 'client', 'get', '/api/v1/categories/', None,
+     HTTPStatus.OK, 3),
+    ('categories-create', 'admin_client', 'post', '/api/v1/categories/',
+     lambda ids: {'name': f'Раздел {ids["n"]}', 'slug': f'part{ids["n"]}'},
+     HTTPStatus.CREATED, 5),
+    ('genres-list', 'client', 'get', '/api/v1/genres/', None,
+     HTTPStatus.OK, 3),
+    ('genres-create', 'admin_client', 'post', '/api/v1/genres/',
+     lambda ids: {'name': f'Жанр {ids["n"]}', 'slug': f'genre{ids["n"]}'},
+     HTTPStatus.CREATED, 5),
+    ('titles-list', 'client', 'get', '/api/v1/titles/', None,
+     HTTPStatus.OK, 4),
+    ('titles-list-cursor', 'client', 'get',
+     '/api/v1/titles/?pagination=cursor', None, HTTPStatus.OK, 3),
+    ('titles-detail', 'client', 'get', '/api/v1/titles/{title}/', None,
+     HTTPStatus.OK, 4),
+    ('titles-facets', 'client', 'get', '/api/v1/titles/facets/', None,
+     HTTPStatus.OK, 3),
+    ('titles-fuzzy', 'client', 'get', '/api/v1/titles/fuzzy/?query=Фильм',
+     None, HTTPStatus.OK, 4),
+    ('titles-create', 'admin_client', 'post', '/api/v1/titles/',
+     lambda ids: {'name': f'Новинка {ids["n"]}', 'year': 2020,
+                  'genre': [ids['genre']], 'category': ids['category']},
+     HTTPStatus.CREATED, 21),
+    ('titles-bulk', 'admin_client', 'post', '/api/v1/titles/bulk/',
+     titles_payload, HTTPStatus.CREATED, 15),
+    ('titles-update', 'admin_client', 'patch', '/api/v1/titles/{title}/',
+     {'year': 1999}, HTTPStatus.OK, 16),
+    ('reviews-list', 'client', 'get', '/api/v1/titles/{title}/reviews/',
+     None, HTTPStatus.OK, 4),
+    ('reviews-detail', 'client', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/', None, HTTPStatus.OK, 2),
+    ('reviews-create', 'admin_client', 'post',
+     '/api/v1/titles/{fresh_title}/reviews/',
+     {'text': 'Отзыв', 'score': 7}, HTTPStatus.CREATED, 7),
+    ('reviews-bulk', 'admin_client', 'post',
+     '/api/v1/titles/{fresh_title}/reviews/bulk/', reviews_payload,
+     HTTPStatus.CREATED, 9),
+    ('comments-list', 'client', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/', None,
+     HTTPStatus.OK, 3),
+    ('comments-detail', 'client', 'get',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/', None,
+     HTTPStatus.OK, 2),
+    ('comments-create', 'admin_client', 'post',
+     '/api/v1/titles/{title}/reviews/{review}/comments/',
+     {'text': 'Комментарий'}, HTTPStatus.CREATED, 4),
+    ('comments-bulk', 'admin_client', 'post',
+     '/api/v1/titles/{title}/reviews/{review}/comments/bulk/',
+     comments_payload, HTTPStatus.CREATED, 6),
+    ('imports-list', 'admin_client', 'get', '/api/v1/imports/', None,
+     HTTPStatus.OK, 3),
+    ('imports-detail', 'admin_client', 'get', '/api/v1/imports/{job}/',
+     None, HTTPStatus.OK, 2),
+    ('imports-create', 'admin_client', 'post', '/api/v1/imports/',
+     csv_upload, HTTPStatus.ACCEPTED, 2),
+    ('cache-stats', 'admin_client', 'get', '/api/v1/cache/stats/', None,
+     HTTPStatus.OK, 1),
+    ('instrumentation', 'admin_client', 'get',
+     '/api/v1/instrumentation/', None, HTTPStatus.OK, 1),
+    ('slow-queries', 'admin_client', 'get',
+     '/api/v1/instrumentation/slow-queries/', None, HTTPStatus.OK, 1),
+    ('metrics', 'client', 'get', '/metrics', None, HTTPStatus.OK, 0),
+    ('export', 'admin_client', 'get', '/api/v1/export/reviews.ndjson',
+     None, HTTPStatus.OK, 2),
+    ('sync', 'admin_client', 'get', '/api/v1/sync/titles/', None,
+     HTTPStatus.OK, 3),
+]
+
+
+def seed(start, stop):
+    """Добавляет произведения, читателей, отзывы и комментарии.
+
+    Каждый новый читатель оценивает первое произведение и комментирует
+    первый отзыв, поэтому списки и связи растут вместе с объёмом.
+    """
+    category, _ = Category.objects.get_or_create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.get_or_create(name=name, slug=slug)[0]
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'))
+    ]
+    for idx in range(start, stop):
+        title = Title.objects.create(
+            name=f'Фильм {idx}', year=2000, category=category,
+            description=f'Описание {idx}',
+        )
+        title.genre.set(genres)
+        reader = User.objects.create_user(
+            username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+        )
+        target = Title.objects.order_by('pk').first()
+        review = Review.objects.create(
+            title=target, author=reader, text=f'Отзыв {idx}', score=idx % 10
+        )
+        Comment.objects.create(
+            review=target.reviews.order_by('pk').first(), author=reader,
+            text=f'Комментарий к {review.pk}',
+        )
+    title = Title.objects.order_by('pk').first()
+    review = title.reviews.order_by('pk').first()
+    job = ImportJob.objects.create(chunk_size=stop)
+    return {
+        'n': stop,
+        'title': title.pk,
+        'fresh_title': Title.objects.order_by('pk').last().pk,
+        'review': review.pk,
+        'comment': review.comments.order_by('pk').first().pk,
+        'category': category.slug,
+        'genre': genres[0].slug,
+        'username': 'reader0',
+        'job': job.pk,
+    }
+
+
+def set_page_size(monkeypatch, size):
+    monkeypatch.setattr(pagination.PageNumberPagination, 'page_size', size)
+    monkeypatch.setattr(pagination.CursorPagination, 'page_size', size)
+
+
+def capture_queries(client, method, url, data, status):
+    """Запросы к базе за один запрос к API без кэша ответов."""
+    cache.clear()
+    # Пакетные маршруты принимают список, его передаёт только JSON.
+    extra = {'format': 'json'} if isinstance(data, list) else {}
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data, **extra)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code == status, (
+        f'Проверьте, что {method.upper()}-запрос к `{url}` возвращает '
+        f'ответ со статусом {status}.'
+    )
+    return [query['sql'] for query in context.captured_queries]
+
+
+def request_route(client, route, ids):
+    _, _, method, url, data, status, _ = route
+    if callable(data):
+        data = data(ids)
+    return capture_queries(client, method, url.format(**ids), data, status)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23QueryBudget:
+
+    @pytest.mark.parametrize(
+        'route', ROUTES, ids=[route[0] for route in ROUTES]
+    )
+    def test_01_query_budget(self, request, monkeypatch, settings,
+                             tmp_path, route):
+        settings.SYNC_SETTLE_SECONDS = 0
+        settings.MEDIA_ROOT = tmp_path
+        settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+        name, role, method, url, *_, budget = route
+        client = request.getfixturevalue(role)
+
+        set_page_size(monkeypatch, 2)
+        small = request_route(client, route, seed(0, 3))
+        set_page_size(monkeypatch, 10)
+        large = request_route(client, route, seed(3, 15))
+
+        for queries in (small, large):
+            assert len(queries) <= budget, (
+                f'Проверьте, что {method.upper()}-запрос `{name}` к `{url}` '
+                f'выполняет не больше {budget} запросов к базе, а не '
+                f'{len(queries)}:\n' + '\n'.join(queries)
+            )
+        assert len(large) == len(small), (
+            f'Проверьте, что число запросов `{name}` к `{url}` не растёт '
+            f'с размером страницы и числом строк: {len(small)} на малом '
+            f'объёме и {len(large)} на большом:\n' + '\n'.join(large)
+        )
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework import serializers
+
+from api.instrumentation import report
+from tests.utils import create_titles
+
+
+def routes(client):
+    response = client.get('/api/v1/instrumentation/', {'recent': 5})
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    return {item['route']: item for item in data['routes']}, data['recent']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Instrumentation:
+
+    @pytest.fixture(autouse=True)
+    def clear_report(self):
+        report.clear()
+
+    def test_01_server_timing_and_report(self, client, admin_client,
+                                         user_client):
+        create_titles(admin_client)
+        report.clear()
+        response = client.get('/api/v1/titles/')
+        timing = response.get('Server-Timing', '')
+        assert 'total;dur=' in timing and 'serializer;dur=' in timing, (
+            'Проверьте, что ответ содержит заголовок Server-Timing с '
+            'общим временем и временем сериализации.'
+        )
+        assert 'db;dur=' in timing and 'desc="4 sql"' in timing, (
+            'Проверьте, что Server-Timing содержит число и время '
+            'запросов к базе.'
+        )
+        client.get('/api/v1/titles/')
+
+        url = '/api/v1/instrumentation/'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+        summary, recent = routes(admin_client)
+        assert summary['titles-list']['count'] == 2, (
+            f'Проверьте, что `{url}` группирует замеры по маршрутам.'
+        )
+        assert summary['titles-list']['avg_serializer_ms'] > 0
+        assert 'titles-detail' not in summary
+        # Второй запрос отдан из кэша ответов.
+        assert [item['sql_count'] for item in recent[:2]] == [4, 1], (
+            f'Проверьте, что `{url}` отдаёт замеры последних запросов.'
+        )
+
+        assert admin_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        assert 'titles-list' not in routes(admin_client)[0]
+
+    def test_02_profiling(self, settings, client, admin_client):
+        url = '/api/v1/instrumentation/'
+        client.get('/api/v1/genres/', HTTP_X_PROFILE='secret')
+        assert admin_client.get(url).json()['profiles'] == [], (
+            'Проверьте, что без PROFILE_HEADER_TOKEN заголовок X-Profile '
+            'не включает профилирование.'
+        )
+
+        settings.PROFILE_HEADER_TOKEN = 'secret'
+        client.get('/api/v1/genres/', HTTP_X_PROFILE='wrong')
+        client.get('/api/v1/genres/', HTTP_X_PROFILE='secret')
+        profiles = admin_client.get(url).json()['profiles']
+        assert [item['route'] for item in profiles] == ['genres-list'], (
+            'Проверьте, что запрос с верным заголовком X-Profile '
+            'выполняется под профилировщиком.'
+        )
+        assert 'cumulative' in profiles[0]['profile']
+
+        settings.PROFILE_SAMPLE_RATE = 1.0
+        client.get('/api/v1/categories/')
+        profiles = admin_client.get(url).json()['profiles']
+        assert profiles[-1]['route'] == 'categories-list', (
+            'Проверьте, что PROFILE_SAMPLE_RATE включает профилирование '
+            'доли запросов.'
+        )
+
+    def test_04_serializer_timing_scope(self, settings, client,
+                                        admin_client):
+        create_titles(admin_client)
+        for cls in (serializers.BaseSerializer, serializers.Serializer,
+                    serializers.ListSerializer):
+            assert cls.data.fget.__module__ == serializers.__name__, (
+                'Проверьте, что сериализаторы DRF не подменяются на весь '
+                'процесс.'
+            )
+        settings.VALUES_READ_MODE = True
+        report.clear()
+        client.get('/api/v1/titles/')
+        recent = report.as_dict()['recent']
+        assert recent[-1]['serializer_ms'] > 0, (
+            'Проверьте, что время вывода учитывается и при чтении через '
+            'values().'
+        )
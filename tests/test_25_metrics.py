@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import RequestFactory
+
+from api.instrumentation import RequestMetrics
+from api.metrics import MetricsStore, store
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что GET-запрос к `/metrics` возвращает ответ со '
+        'статусом 200.'
+    )
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+
+def sample(text, line):
+    """Значение строки метрики с заданным именем и метками."""
+    for item in text.splitlines():
+        if item.startswith(line + ' '):
+            return float(item.rsplit(' ', 1)[1])
+    return None
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Metrics:
+
+    @pytest.fixture(autouse=True)
+    def clear_store(self, settings):
+        settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+        store.clear()
+
+    def test_01_request_metrics(self, client, admin_client):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        client.post('/api/v1/auth/signup/', {})
+        text = scrape(client)
+        line = ('yamdb_http_requests_total'
+                '{route="genres-list",method="GET",status="200"}')
+        assert sample(text, line) == 2, (
+            'Проверьте, что `/metrics` считает запросы по маршруту, методу '
+            'и статусу.'
+        )
+        assert sample(
+            text, 'yamdb_http_requests_total'
+            '{route="signup",method="POST",status="400"}'
+        ) == 1, 'Проверьте, что `/metrics` учитывает запросы регистрации.'
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_count'
+            '{route="genres-list",method="GET"}'
+        ) == 2
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_bucket'
+            '{route="genres-list",method="GET",le="+Inf"}'
+        ) == 2, 'Проверьте, что `/metrics` отдаёт гистограммы задержки.'
+        assert sample(
+            text, 'yamdb_db_queries_per_request_sum{route="genres-list"}'
+        ) > 0, 'Проверьте, что `/metrics` считает запросы к базе.'
+        assert '# TYPE yamdb_db_duration_seconds histogram' in text
+        assert sample(
+            text, 'yamdb_response_cache_requests_total{result="hit"}'
+        ) == 1, 'Проверьте, что `/metrics` отдаёт попадания в кэш ответов.'
+        assert sample(text, 'yamdb_response_cache_hit_ratio') == 0.5
+
+    def test_02_worker_files(self, settings, tmp_path, client):
+        settings.METRICS_DIR = str(tmp_path)
+        settings.METRICS_FLUSH_SECONDS = 0
+        # Другой, уже завершившийся обработчик оставил свой файл.
+        worker = MetricsStore()
+        metrics = RequestMetrics(RequestFactory().get('/api/v1/titles/'))
+        metrics.route, metrics.status, metrics.wall = 'titles-list', 200, 0.2
+        for _ in range(3):
+            worker.observe_cache(hit=True)
+            worker.observe_request(metrics)
+        assert len(list(tmp_path.iterdir())) == 1
+
+        client.get('/api/v1/titles/')
+        text = scrape(client)
+        line = ('yamdb_http_requests_total'
+                '{route="titles-list",method="GET",status="200"}')
+        assert sample(text, line) == 4, (
+            'Проверьте, что `/metrics` складывает значения всех процессов '
+            'из METRICS_DIR.'
+        )
+        assert sample(
+            text, 'yamdb_http_request_duration_seconds_bucket'
+            '{route="titles-list",method="GET",le="0.25"}'
+        ) == 4
+        assert sample(
+            text, 'yamdb_response_cache_requests_total{result="hit"}'
+        ) == 3, (
+            'Проверьте, что попадания в кэш ответов складываются по всем '
+            'процессам.'
+        )
+        assert sample(
+            text, 'yamdb_response_cache_requests_total{result="miss"}'
+        ) == 1
+        assert sample(text, 'yamdb_response_cache_hit_ratio') == 0.75
+        assert len(list(tmp_path.iterdir())) == 2, (
+            'Проверьте, что каждый процесс сохраняет метрики в свой файл.'
+        )
+
+    def test_03_access(self, settings, client):
+        settings.METRICS_ALLOWED_IPS = ()
+        assert client.get('/metrics').status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что по умолчанию `/metrics` закрыт.'
+        )
+        settings.METRICS_TOKEN = 'secret'
+        response = client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `/metrics` доступен с токеном METRICS_TOKEN.'
+        )
+
+        settings.METRICS_TOKEN = ''
+        settings.METRICS_ALLOWED_IPS = ('10.0.0.0/8',)
+        response = client.get('/metrics', REMOTE_ADDR='10.1.2.3')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `/metrics` доступен из сетей '
+            'METRICS_ALLOWED_IPS.'
+        )
+        assert client.get('/metrics').status_code == HTTPStatus.FORBIDDEN
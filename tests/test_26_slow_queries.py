@@ -0,0 +1,126 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+
+from api.slow_queries import explain, fingerprint, log
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+def without_optimization(queryset, serializer_class, defer=False):
+    return queryset
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SlowQueries:
+
+    @pytest.fixture(autouse=True)
+    def log_every_query(self, settings):
+        settings.SLOW_QUERY_SECONDS = 0
+        log.clear()
+
+    def test_01_fingerprint(self):
+        assert fingerprint(
+            "SELECT *  FROM t\nWHERE id IN (1, 2, 3) AND name = 'it''s' "
+            'AND year > %s AND t2 = 1.5'
+        ) == (
+            'SELECT * FROM t WHERE id IN (...) AND name = ? AND year > ? '
+            'AND t2 = ?'
+        ), 'Проверьте, что отпечаток запроса не содержит литералов.'
+
+    def test_02_request_queries(self, client, admin_client, user_client):
+        create_titles(admin_client)
+        log.clear()
+        client.get('/api/v1/titles/', {'name': 'Терм'})
+        client.get('/api/v1/titles/', {'name': 'Креп'})
+
+        url = '/api/v1/instrumentation/slow-queries/'
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 403.'
+        )
+        data = admin_client.get(url).json()
+        entries = [
+            entry for entry in data['queries']
+            if 'LIKE' in entry['fingerprint']
+        ]
+        # Подсчёт и выборка страницы на каждый из двух запросов.
+        assert len(entries) == 4, (
+            'Проверьте, что журнал содержит запросы дольше '
+            'SLOW_QUERY_SECONDS.'
+        )
+        entry = entries[0]
+        assert entry['route'] == 'titles-list'
+        assert entry['view'] == 'api.views.TitleViewSet.list', (
+            'Проверьте, что журнал указывает вызвавшее запрос представление.'
+        )
+        assert 'Креп' not in entry['fingerprint']
+        assert any('SCAN' in line for line in entry['plan']), (
+            'Проверьте, что журнал содержит план запроса из EXPLAIN.'
+        )
+        assert any(
+            item['fingerprint'] == entry['fingerprint'] and item['count'] == 2
+            for item in data['fingerprints']
+        ), 'Проверьте, что журнал группирует запросы по отпечатку.'
+
+        assert admin_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        assert all(
+            'LIKE' not in entry['fingerprint']
+            for entry in admin_client.get(url).json()['queries']
+        )
+
+    def test_03_serializer_and_limits(self, settings, tmp_path,
+                                      monkeypatch, client, admin_client):
+        create_titles(admin_client)
+        # Без подгрузки связей жанры читаются при выводе сериализатора.
+        monkeypatch.setattr(
+            'api.mixins.optimize_queryset', without_optimization
+        )
+        settings.SLOW_QUERY_LOG_FILE = str(tmp_path / 'slow.log')
+        log.clear()
+        client.get('/api/v1/titles/')
+        queries = log.as_dict()['queries']
+        assert any(
+            entry['serializer'] == 'TitleGetSerializer'
+            and 'reviews_genre' in entry['sql'] for entry in queries
+        ), (
+            'Проверьте, что журнал указывает сериализатор, при выводе '
+            'которого выполнен запрос.'
+        )
+        with open(tmp_path / 'slow.log', encoding='utf-8') as file:
+            lines = [json.loads(line) for line in file]
+        assert len(lines) == len(queries), (
+            'Проверьте, что медленные запросы пишутся в SLOW_QUERY_LOG_FILE.'
+        )
+
+        settings.SLOW_QUERY_LOG_SIZE = 2
+        log.clear()
+        list(Title.objects.all())
+        list(Title.objects.all())
+        list(Title.objects.all())
+        assert len(log.as_dict()['queries']) == 2, (
+            'Проверьте, что журнал в памяти ограничен SLOW_QUERY_LOG_SIZE.'
+        )
+
+        settings.SLOW_QUERY_SECONDS = 10
+        log.clear()
+        list(Title.objects.all())
+        assert log.as_dict()['queries'] == []
+
+    def test_04_failed_explain(self):
+        with transaction.atomic():
+            plan = explain(connection, 'SELECT * FROM missing_table', ())
+            assert plan[0].startswith('EXPLAIN не выполнен'), (
+                'Проверьте, что ошибка EXPLAIN попадает в план записи.'
+            )
+            assert not connection.needs_rollback, (
+                'Проверьте, что ошибка EXPLAIN откатывает только точку '
+                'сохранения, а не транзакцию запроса.'
+            )
+            assert Title.objects.count() == 0
+        assert all(
+            'SAVEPOINT' not in entry['sql']
+            for entry in log.as_dict()['queries']
+        ), 'Проверьте, что команды EXPLAIN не попадают в журнал.'
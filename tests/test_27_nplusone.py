@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+
+from api.nplusone import NPlusOneError
+from tests.utils import create_comments, create_titles
+
+
+def without_optimization(queryset, serializer_class, defer=False):
+    return queryset
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27NPlusOne:
+
+    @pytest.fixture
+    def data(self, admin_client, admin, user_client, user, moderator_client,
+             moderator):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client,
+        })
+        return reviews, titles
+
+    def test_01_optimized_views(self, settings, client, data):
+        settings.NPLUSONE_MODE = 'strict'
+        _, titles = data
+        for url in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        ):
+            assert client.get(url).status_code == 200, (
+                f'Проверьте, что `{url}` выполняется без N+1 запросов.'
+            )
+
+    def test_02_strict_names_field(self, settings, monkeypatch, client,
+                                   data):
+        settings.NPLUSONE_MODE = 'strict'
+        monkeypatch.setattr(
+            'api.mixins.optimize_queryset', without_optimization
+        )
+        _, titles = data
+        with pytest.raises(NPlusOneError) as error:
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        message = str(error.value)
+        assert 'поле ReviewSerializer.author' in message, (
+            'Проверьте, что предупреждение о N+1 называет поле '
+            'сериализатора.'
+        )
+        assert 'связь Review.author' in message, (
+            'Проверьте, что предупреждение о N+1 называет связь модели.'
+        )
+        assert 'reviews-list' in message
+
+    def test_03_warn_mode(self, settings, monkeypatch, caplog, client,
+                          admin_client):
+        settings.NPLUSONE_MODE = 'warn'
+        settings.NPLUSONE_THRESHOLD = 2
+        monkeypatch.setattr(
+            'api.mixins.optimize_queryset', without_optimization
+        )
+        create_titles(admin_client)
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='api.nplusone'):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200, (
+            'Проверьте, что в режиме warn N+1 не прерывает запрос.'
+        )
+        messages = [record.getMessage() for record in caplog.records]
+        assert any(
+            'поле TitleGetSerializer.genre' in message
+            and 'связь Title.genre' in message
+            for message in messages
+        ), (
+            'Проверьте, что в режиме warn N+1 по жанрам произведений '
+            f'попадает в журнал: {messages}'
+        )
+
+        settings.NPLUSONE_MODE = None
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='api.nplusone'):
+            client.get('/api/v1/titles/?year=1984')
+        assert not caplog.records